@@ -48,6 +48,8 @@ INSTALLED_APPS = [
 ]
 SITE_ID = 1
 MIDDLEWARE = [
+    'project.staticfiles.PrecompressedStaticMiddleware',
+    'project.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,13 +66,21 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
+        # APP_DIRS must be off when loaders are listed; app_directories.Loader covers it.
+        'APP_DIRS': False,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compile each template once per process, in development too.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -89,6 +99,32 @@ DATABASES = {
 }
 
 
+# Cache
+# Sessions, throttle buckets, version counters and cached counts live in the
+# cache, so every worker process must share it and it must increment
+# atomically. Deployments with more than one worker process therefore need
+# Redis (REDIS_URL). Without it a per-process LocMemCache is used, which is
+# only correct for a single process such as runserver.
+
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 10_000},
+        }
+    }
+
+# Tests (and benchmarks) get a private cache instead of the one above.
+TEST_RUNNER = 'project.runner.IsolatedCacheRunner'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -125,6 +161,13 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = os.path.join(BASE_DIR, 'static'),
+# collectstatic writes hashed, gzip/brotli-compressed copies here, and
+# PrecompressedStaticMiddleware serves them.
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'project.staticfiles.CompressedManifestStaticFilesStorage'},
+}
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # Default primary key field type
@@ -132,10 +175,11 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# EmailOrUsernameBackend extends ModelBackend and goes first: it settles
+# username/email + password logins with a single hash and stops the chain.
 AUTHENTICATION_BACKENDS = (
-    'django.contrib.auth.backends.ModelBackend',  # default
-    'allauth.account.auth_backends.AuthenticationBackend',  # allauth
     'project.backends.EmailOrUsernameBackend',
+    'allauth.account.auth_backends.AuthenticationBackend',  # allauth
 )
 
 
@@ -152,6 +196,10 @@ SOCIALACCOUNT_PROVIDERS = {
     }
 }
 
+# Cache-first sessions that only write to the database when something changed.
+# Relies on the shared cache configured in CACHES above.
+SESSION_ENGINE = 'project.session_backend'
+
 LOGIN_URL='login/get'
 LOGOUT_URL='logout'
 LOGIN_REDIRECT_URL='/'
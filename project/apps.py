@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ProjectConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'project'
+
+
+    def ready(self):
+        # Connect signal receivers that live outside models.py.
+        from project import backends, catalogue, images, media_probe, metrics, pagination, rails, viewing_stats  # noqa: F401
+        from project.search import install_search_index
+
+        post_migrate.connect(backends.install_email_index, sender=self)
+        post_migrate.connect(install_search_index, sender=self)
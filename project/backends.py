@@ -1,21 +1,99 @@
+import hashlib
+
+from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db import connections, models
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+UNKNOWN_IDENTIFIER_TIMEOUT = getattr(settings, 'AUTH_UNKNOWN_IDENTIFIER_CACHE_TIMEOUT', 60)
+
+EMAIL_INDEX = models.Index(Lower('email'), name='project_user_email_lower_idx')
+
+
+def unknown_identifier_key(identifier):
+    # Exact, like the username match: folding case would let a failed
+    # 'MovieFan' hide the real 'moviefan'.
+    digest = hashlib.sha256(identifier.encode()).hexdigest()
+    return f'auth:unknown:{digest}'
+
 
 class EmailOrUsernameBackend(ModelBackend):
     """
     Authenticate using either username or email.
+
+    The user is found with one indexed query (username, or case-insensitive
+    email), identifiers that matched nobody are remembered for a short while,
+    and every attempt runs exactly one password hash. A failed attempt raises
+    PermissionDenied so the backends listed after this one don't hash again.
     """
     def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            # Try to fetch user by username
-            user = User.objects.get(username=username)
-        except User.DoesNotExist:
-            try:
-                # If not found, try email
-                user = User.objects.get(email=username)
-            except User.DoesNotExist:
-                return None
-
-        if user.check_password(password):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        user = None
+        key = unknown_identifier_key(username)
+        if not cache.get(key):
+            user = self.find_user(username)
+            if user is None:
+                cache.set(key, True, UNKNOWN_IDENTIFIER_TIMEOUT)
+
+        if user is None:
+            # Hash once anyway so unknown accounts take as long as known ones.
+            User().set_password(password)
+            raise PermissionDenied
+
+        if user.check_password(password) and self.user_can_authenticate(user):
             return user
+        raise PermissionDenied
+
+    def find_user(self, identifier):
+        """
+        Return the user whose username is ``identifier``, else the only user
+        with that email address, else None.
+        """
+        candidates = list(
+            User._default_manager
+            .annotate(email_lower=Lower('email'))
+            .filter(Q(username=identifier) | Q(email_lower=identifier.lower()))[:3]
+        )
+        for user in candidates:
+            if user.username == identifier:
+                return user
+        if len(candidates) == 1:
+            return candidates[0]
+        # Nobody, or an email address shared by several accounts.
         return None
+
+
+def install_email_index(using='default', **kwargs):
+    """
+    Add the LOWER(email) index to auth_user. Connected to post_migrate.
+    """
+    connection = connections[using]
+    table = User._meta.db_table
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    if EMAIL_INDEX.name in constraints:
+        return
+    with connection.schema_editor() as schema_editor:
+        schema_editor.add_index(User, EMAIL_INDEX)
+
+
+@receiver(post_save, sender=User)
+def forget_unknown_identifiers(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    # A new or renamed account must be able to log in straight away.
+    cache.delete_many([
+        unknown_identifier_key(value)
+        for value in {instance.username, instance.email, instance.email.lower()}
+        if value
+    ])
@@ -0,0 +1,200 @@
+"""
+Load and regression benchmarks for the core request paths.
+
+Every scenario drives real requests through the full middleware stack
+with the test client and records requests/sec, p50/p99 latency and
+queries per request. Results can be saved as a baseline and later runs
+compared against it; see ``manage.py benchmark``.
+"""
+import json
+import math
+import time
+from itertools import count
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from project.models import Category
+from project.pagination import encode_cursor
+
+SEED_BATCH_SIZE = 10_000
+PASSWORD = 'BenchPass123!'
+
+
+def percentile(samples, fraction):
+    """
+    Nearest-rank percentile of an unsorted list.
+    """
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(durations, queries):
+    total = sum(durations)
+    return {
+        'requests': len(durations),
+        'rps': round(len(durations) / total, 2) if total else 0.0,
+        'p50_ms': round(percentile(durations, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(durations, 0.99) * 1000, 3),
+        'queries': round(sum(queries) / len(queries), 2),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    List the ways ``results`` regressed against ``baseline``.
+
+    Latency and throughput may drift by ``threshold`` (a fraction) before
+    they count; query counts are deterministic, so any increase counts.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['p99_ms'] > base['p99_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p99 {result['p99_ms']}ms vs baseline {base['p99_ms']}ms")
+        if result['rps'] < base['rps'] * (1 - threshold):
+            regressions.append(f"{name}: {result['rps']} req/s vs baseline {base['rps']} req/s")
+        if result['queries'] > base['queries']:
+            regressions.append(f"{name}: {result['queries']} queries/request vs baseline {base['queries']}")
+    return regressions
+
+
+def load_baseline(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, results):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+
+def seed_categories(size):
+    """
+    Replace the category table with ``size`` rows.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {Category._meta.db_table}')
+    for start in range(0, size, SEED_BATCH_SIZE):
+        Category.objects.bulk_create(
+            Category(name=f'Bench category {i}', slug=f'bench-category-{i}')
+            for i in range(start, min(start + SEED_BATCH_SIZE, size))
+        )
+    cache.clear()
+
+
+class BenchmarkRunner:
+    """
+    Runs the scenarios against whatever database is currently configured.
+    The management command points it at a throwaway test database.
+    """
+    def __init__(self, requests=50, sizes=(1_000, 100_000, 1_000_000), stdout=None):
+        self.requests = requests
+        self.sizes = sizes
+        self.stdout = stdout
+        self._unique = count()
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def measure(self, name, make_request):
+        durations, queries = [], []
+        for _ in range(self.requests):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = make_request()
+                durations.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                raise RuntimeError(f'{name} returned HTTP {response.status_code}')
+            queries.append(len(captured.captured_queries))
+        result = summarize(durations, queries)
+        self.log(
+            f"{name:<36} {result['rps']:>10.1f} req/s  p50 {result['p50_ms']:>9.2f}ms  "
+            f"p99 {result['p99_ms']:>9.2f}ms  {result['queries']:>6.1f} queries"
+        )
+        return result
+
+    def run(self):
+        results = {}
+        # Throttling would reject the repeated logins after a few attempts.
+        with override_settings(LOGIN_THROTTLE_ENABLED=False):
+            results.update(self.run_auth())
+            results.update(self.run_dashboard())
+        return results
+
+    def run_auth(self):
+        results = {}
+        User.objects.create_user(username='bench-login', email='bench-login@example.com', password=PASSWORD)
+        client = Client()
+        login_url = reverse('website:login-view-post')
+        results['login'] = self.measure(
+            'login',
+            lambda: client.post(login_url, {'username': 'bench-login', 'password': PASSWORD}),
+        )
+
+        signup_url = reverse('website:signup-view')
+
+        def signup():
+            n = next(self._unique)
+            return Client().post(signup_url, {
+                'username': f'bench-signup-{n}',
+                'first_name': 'Bench',
+                'last_name': 'User',
+                'email': f'bench-signup-{n}@example.com',
+                'password1': PASSWORD,
+                'password2': PASSWORD,
+            })
+        results['signup'] = self.measure('signup', signup)
+        return results
+
+    def run_dashboard(self):
+        results = {}
+        admin = User.objects.create_superuser(username='bench-admin', email='bench-admin@example.com', password=PASSWORD)
+        client = Client()
+        client.force_login(admin)
+        list_url = reverse('website:category-view')
+
+        for size in self.sizes:
+            self.log(f'Seeding {size} categories...')
+            seed_categories(size)
+            middle_page = max(1, size // 20)
+            results[f'category_list[{size}]'] = self.measure(
+                f'category_list[{size}]', lambda: client.get(list_url),
+            )
+            results[f'category_list_deep[{size}]'] = self.measure(
+                f'category_list_deep[{size}]', lambda: client.get(list_url, {'page': middle_page}),
+            )
+            middle_id = Category.objects.order_by('id').values_list('id', flat=True)[size // 2] if size else 0
+            cursor = encode_cursor({'v': middle_id, 'd': 'n', 'o': size // 2})
+            results[f'category_list_cursor[{size}]'] = self.measure(
+                f'category_list_cursor[{size}]', lambda: client.get(list_url, {'cursor': cursor}),
+            )
+
+        def create():
+            return client.post(reverse('website:create-category-view'), {'name': f'Bench new {next(self._unique)}'})
+        results['category_create'] = self.measure('category_create', create)
+
+        # Pick the rows up front so the lookups are not measured.
+        targets = list(Category.objects.order_by('-id').values_list('pk', flat=True)[:self.requests])
+        edit_targets = iter(targets)
+        results['category_edit'] = self.measure('category_edit', lambda: client.post(
+            reverse('website:edit-category-view', kwargs={'pk': next(edit_targets)}),
+            {'name': f'Bench edited {next(self._unique)}'},
+        ))
+        delete_targets = iter(targets)
+        results['category_delete'] = self.measure('category_delete', lambda: client.post(
+            reverse('website:delete-category-view', kwargs={'pk': next(delete_targets)}),
+        ))
+        return results
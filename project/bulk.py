@@ -0,0 +1,274 @@
+"""
+Streaming bulk import/export of categories and movies, as CSV or JSON Lines.
+
+Imports validate every row with the same form rules as the dashboard, insert
+with ``bulk_create`` in batches, and run inside one transaction: either the
+whole file goes in or nothing does. Exports stream rows from the database
+with ``.iterator()``, so a large catalogue is never held in memory.
+"""
+import csv
+import io
+import json
+
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from project.cache_versions import bump_version
+from project.catalogue import bump_table
+from project.collectForms.categories_forms import CategoryForm
+from project.collectForms.movies_forms import MovieForm
+from project.models import Category, Movie
+from project.pagination import row_count_cache_key
+from project.rails import rail_version_name
+from project.slugs import allocate_slugs
+
+IMPORT_BATCH_SIZE = getattr(settings, 'BULK_IMPORT_BATCH_SIZE', 1000)
+EXPORT_CHUNK_SIZE = getattr(settings, 'BULK_EXPORT_CHUNK_SIZE', 2000)
+MAX_REPORTED_ERRORS = 20
+
+FORMATS = ('csv', 'jsonl')
+KINDS = ('categories', 'movies')
+
+EXPORT_COLUMNS = {
+    'categories': ['name', 'slug'],
+    'movies': ['title', 'slug', 'category', 'description', 'release_year', 'duration_minutes'],
+}
+
+
+class ImportFailed(Exception):
+    """
+    Raised with a list of (line number, message) pairs when rows are invalid.
+    """
+    def __init__(self, errors):
+        super().__init__(f'{len(errors)} invalid rows')
+        self.errors = errors
+
+
+def guess_format(filename):
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_rows(file, file_format):
+    """
+    Yield (line number, row dict) from a binary or text file, one row at a time.
+    Undecodable or malformed input raises ImportFailed.
+    """
+    if not isinstance(file, io.TextIOBase):
+        file = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+
+    rows = _csv_rows(file) if file_format == 'csv' else _jsonl_rows(file)
+    line_number = 0
+    try:
+        for line_number, row in rows:
+            yield line_number, row
+    except UnicodeDecodeError:
+        # Text is decoded in blocks, so the bad byte may be a little further on.
+        raise ImportFailed([(line_number + 1, 'File is not UTF-8 encoded (error at or after this line).')])
+    except csv.Error as error:
+        raise ImportFailed([(line_number + 1, f'Malformed CSV: {error}.')])
+
+
+def _csv_rows(file):
+    reader = csv.DictReader(file)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _jsonl_rows(file):
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if not isinstance(row, dict):
+            raise ImportFailed([(line_number, 'Line is not a JSON object.')])
+        yield line_number, row
+
+
+class CategoryImportForm(CategoryForm):
+    def validate_unique(self):
+        # Uniqueness is checked against one preloaded set, not a query per row.
+        pass
+
+
+class MovieImportForm(MovieForm):
+    class Meta(MovieForm.Meta):
+        # Category is resolved from a preloaded map; files are not imported.
+        fields = ['title', 'description', 'release_year', 'duration_minutes']
+
+    def clean_duration_minutes(self):
+        # Without a video there is nothing for the media probe to read it from.
+        duration = self.cleaned_data.get('duration_minutes')
+        if not duration:
+            raise forms.ValidationError("Duration must be greater than 0 minutes.")
+        return duration
+
+
+def _form_errors(form):
+    return '; '.join(
+        f'{field}: {message}' if field != '__all__' else message
+        for field, messages in form.errors.items()
+        for message in messages
+    )
+
+
+class Importer:
+    model = None
+    slug_source = None
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.errors = []
+        self.created = 0
+        self._batch = []
+
+    def run(self, rows):
+        """
+        Validate and insert every row. Returns the number of rows created.
+        """
+        try:
+            with transaction.atomic():
+                self.prepare()
+                for line_number, row in rows:
+                    instance = self.build(line_number, row)
+                    if instance is None or self.errors:
+                        if len(self.errors) >= MAX_REPORTED_ERRORS:
+                            break
+                        continue
+                    self._batch.append(instance)
+                    if len(self._batch) >= self.batch_size:
+                        self.flush()
+                if self.errors:
+                    raise ImportFailed(self.errors)
+                self.flush()
+                transaction.on_commit(self.invalidate_caches)
+        except IntegrityError as error:
+            raise ImportFailed([(None, str(error))])
+        return self.created
+
+    def error(self, line_number, message):
+        self.errors.append((line_number, message))
+
+    def flush(self):
+        if self._batch:
+            # Earlier batches are already in the table, so they are seen here.
+            allocate_slugs(self.model, self._batch, self.slug_source)
+            self.model.objects.bulk_create(self._batch, batch_size=self.batch_size)
+            self.created += len(self._batch)
+            self._batch = []
+
+    def invalidate_caches(self):
+        # bulk_create sends no post_save signals.
+        cache.delete(row_count_cache_key(self.model))
+        bump_table(self.model)
+
+    def prepare(self):
+        pass
+
+    def build(self, line_number, row):
+        raise NotImplementedError
+
+
+class CategoryImporter(Importer):
+    model = Category
+    slug_source = 'name'
+
+    def prepare(self):
+        self.names = set(Category.objects.values_list('name', flat=True).iterator(chunk_size=EXPORT_CHUNK_SIZE))
+
+    def build(self, line_number, row):
+        form = CategoryImportForm(data={'name': row.get('name') or ''})
+        if not form.is_valid():
+            self.error(line_number, _form_errors(form))
+            return None
+        name = form.cleaned_data['name']
+        if name in self.names:
+            self.error(line_number, f'Category "{name}" already exists.')
+            return None
+        self.names.add(name)
+        return Category(name=name)
+
+
+class MovieImporter(Importer):
+    model = Movie
+    slug_source = 'title'
+
+    def prepare(self):
+        self.categories = {}
+        for pk, name, slug in Category.objects.values_list('pk', 'name', 'slug'):
+            self.categories[name.lower()] = pk
+            self.categories[slug] = pk
+        self.category_ids = set()
+
+    def build(self, line_number, row):
+        form = MovieImportForm(data={
+            field: row.get(field) if row.get(field) is not None else ''
+            for field in MovieImportForm.Meta.fields
+        })
+        if not form.is_valid():
+            self.error(line_number, _form_errors(form))
+            return None
+
+        category_id = None
+        category = str(row.get('category') or '').strip()
+        if category:
+            category_id = self.categories.get(category.lower(), self.categories.get(category))
+            if category_id is None:
+                self.error(line_number, f'Unknown category "{category}".')
+                return None
+            self.category_ids.add(category_id)
+
+        movie = form.save(commit=False)
+        movie.category_id = category_id
+        return movie
+
+    def invalidate_caches(self):
+        super().invalidate_caches()
+        for category_id in self.category_ids:
+            bump_version(rail_version_name(category_id))
+
+
+IMPORTERS = {
+    'categories': CategoryImporter,
+    'movies': MovieImporter,
+}
+
+
+def import_file(kind, file, file_format, batch_size=IMPORT_BATCH_SIZE):
+    return IMPORTERS[kind](batch_size).run(read_rows(file, file_format))
+
+
+class _Echo:
+    """
+    File-like object whose write() hands the line back, for csv.writer.
+    """
+    def write(self, value):
+        return value
+
+
+def _export_queryset(kind):
+    if kind == 'categories':
+        return Category.objects.order_by('id').values_list('name', 'slug')
+    return Movie.objects.order_by('id').values_list(
+        'title', 'slug', 'category__name', 'description', 'release_year', 'duration_minutes',
+    )
+
+
+def export_rows(kind, file_format):
+    """
+    Yield the export of ``kind`` as text chunks, one row per chunk.
+    """
+    columns = EXPORT_COLUMNS[kind]
+    rows = _export_queryset(kind).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if file_format == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow(row)
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n'
@@ -0,0 +1,70 @@
+"""
+Named version counters kept in the cache.
+
+Cached data is keyed by the current version of whatever it was built
+from; bumping the version invalidates every copy at once without having
+to know their keys. Bumps reach other processes only through a shared
+cache backend (see CACHES in settings).
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _cache_key(name):
+    return f'version:{name}'
+
+
+def _fresh_version():
+    # Time based so that a lost counter never restarts at an old value.
+    return time.time_ns()
+
+
+def get_versions(names):
+    """
+    Return {name: version} for every name, creating missing counters.
+    """
+    keys = {_cache_key(name): name for name in names}
+    found = cache.get_many(list(keys))
+    for key in keys:
+        if key not in found:
+            cache.add(key, _fresh_version(), None)
+            found[key] = cache.get(key)
+    return {keys[key]: version for key, version in found.items()}
+
+
+async def aget_versions(names):
+    """
+    Async get_versions(), for views that shouldn't block on the cache.
+    """
+    keys = {_cache_key(name): name for name in names}
+    found = await cache.aget_many(list(keys))
+    for key in keys:
+        if key not in found:
+            await cache.aadd(key, _fresh_version(), None)
+            found[key] = await cache.aget(key)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def get_version(name):
+    return get_versions([name])[name]
+
+
+def _bump(name):
+    try:
+        cache.incr(_cache_key(name))
+    except ValueError:
+        cache.set(_cache_key(name), _fresh_version(), None)
+
+
+def bump_version(name, using=None):
+    """
+    Invalidate everything cached under ``name``.
+
+    The counter is bumped right away, so this process sees the change, and
+    again after commit, so no other process can cache pre-commit data under
+    the new version.
+    """
+    _bump(name)
+    transaction.on_commit(lambda: _bump(name), using=using)
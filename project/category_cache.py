@@ -0,0 +1,113 @@
+"""
+Process-local cache of the (small) Category table.
+
+Each process keeps every category in memory and checks the table's shared
+version counter (see catalogue.table_version_name) on each read; the
+counter is bumped by Category post_save/post_delete. The counter lives in
+the default cache, so other processes only see the bump if that cache is
+shared between them (see CACHES in settings; a LocMemCache is not). In
+steady state a lookup costs one cache read and no queries.
+
+The cached instances are shared between threads and requests: treat them
+as read-only.
+"""
+import threading
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.forms.models import ModelChoiceIterator
+
+from project.cache_versions import get_version
+from project.catalogue import table_version_name
+from project.models import Category
+
+
+class _Snapshot:
+    __slots__ = ('version', 'categories', 'by_pk', 'by_slug')
+
+    def __init__(self, version, categories):
+        self.version = version
+        self.categories = tuple(categories)
+        self.by_pk = {category.pk: category for category in self.categories}
+        self.by_slug = {category.slug: category for category in self.categories}
+
+
+class CategoryCache:
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _current(self):
+        version = get_version(table_version_name(Category))
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != version:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.version != version:
+                    # Rows read after the version was, so they are at least that new.
+                    snapshot = self._snapshot = _Snapshot(version, Category.objects.order_by('name'))
+        return snapshot
+
+    def all(self):
+        """
+        Every category, ordered by name.
+        """
+        return self._current().categories
+
+    def get(self, pk):
+        return self._current().by_pk.get(pk)
+
+    def get_by_slug(self, slug):
+        return self._current().by_slug.get(slug)
+
+    def id_for_slug(self, slug):
+        category = self.get_by_slug(slug)
+        return category.pk if category else None
+
+    def clear(self):
+        self._snapshot = None
+
+
+category_cache = CategoryCache()
+
+
+class CachedCategoryIterator(ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for category in category_cache.all():
+            yield self.choice(category)
+
+    def __len__(self):
+        return len(category_cache.all()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(category_cache.all())
+
+
+class CachedCategoryChoiceField(forms.ModelChoiceField):
+    """
+    A Category ModelChoiceField whose choices and validation come from the
+    category cache instead of a query.
+    """
+    iterator = CachedCategoryIterator
+
+    def __init__(self, **kwargs):
+        super().__init__(queryset=Category.objects.all(), **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, Category):
+            value = value.pk
+        try:
+            category = category_cache.get(int(value))
+        except (TypeError, ValueError):
+            category = None
+        if category is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return category
@@ -0,0 +1,20 @@
+from django import forms
+
+from project.bulk import FORMATS
+
+
+class CatalogueImportForm(forms.Form):
+    """
+    Upload form for importing categories or movies from CSV or JSON Lines.
+    """
+    file = forms.FileField(
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv,.jsonl,.ndjson',
+        })
+    )
+    format = forms.ChoiceField(
+        required=False,
+        choices=[('', 'Detect from file name')] + [(name, name.upper()) for name in FORMATS],
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
@@ -1,5 +1,9 @@
+import os
+
 from django import forms
-from project.models import Movie, WatchHistory, Category
+from project.category_cache import CachedCategoryChoiceField
+from project.models import ChunkedUpload, Movie, WatchHistory
+from project.uploads import MAX_UPLOAD_SIZE
 
 class MovieForm(forms.ModelForm):
     """
@@ -42,10 +46,17 @@ class MovieForm(forms.ModelForm):
             'video_file': forms.ClearableFileInput(attrs={'class': 'form-control'}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'duration_minutes' in self.fields:
+            # Left empty, the media probe reads it from the video once one is
+            # uploaded, here or in chunks; the request never scans the file.
+            self.fields['duration_minutes'].required = False
+
     def clean_duration_minutes(self):
         duration = self.cleaned_data.get('duration_minutes')
-        if duration <= 0:
-            raise forms.ValidationError("Duration must be greater than 0 minutes.")
+        if not duration:
+            return self.instance.duration_minutes or 0
         return duration
 
 
@@ -75,8 +86,7 @@ class MovieFilterForm(forms.Form):
     """
     Optional: Simple form to filter movies by category or search keyword.
     """
-    category = forms.ModelChoiceField(
-        queryset=Category.objects.all(),
+    category = CachedCategoryChoiceField(
         required=False,
         widget=forms.Select(attrs={'class': 'form-select'})
     )
@@ -87,3 +97,26 @@ class MovieFilterForm(forms.Form):
             'placeholder': 'Search by title...',
         })
     )
+
+
+class ChunkedUploadForm(forms.ModelForm):
+    """
+    Starts a chunked upload of a movie's video file.
+    """
+    class Meta:
+        model = ChunkedUpload
+        fields = ['filename', 'total_size']
+
+    def clean_filename(self):
+        filename = os.path.basename(self.cleaned_data.get('filename').replace('\\', '/'))
+        if not filename:
+            raise forms.ValidationError("File name cannot be empty.")
+        return filename
+
+    def clean_total_size(self):
+        total_size = self.cleaned_data.get('total_size')
+        if total_size <= 0:
+            raise forms.ValidationError("File size must be greater than 0 bytes.")
+        if total_size > MAX_UPLOAD_SIZE:
+            raise forms.ValidationError(f"Files may be at most {MAX_UPLOAD_SIZE} bytes.")
+        return total_size
@@ -0,0 +1,190 @@
+"""
+Responsive image derivatives for movie thumbnails and profile pictures.
+
+Every uploaded image gets fixed-width WebP and JPEG variants stored next to
+the original under a deterministic name (``poster.jpg`` ->
+``poster.w320.webp``). They are generated in the background worker pool
+and used by the ``responsive_image`` template tag.
+
+Which widths exist for an image is recorded in the cache once its job has
+written them all, so rendering the tag costs one cache read rather than a
+storage lookup per variant. Replacing an image deletes the old variants.
+"""
+import hashlib
+import io
+import posixpath
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from PIL import Image, ImageOps
+
+from project import tasks
+from project.models import Movie, UserInfo
+
+DERIVATIVE_WIDTHS = tuple(getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', (320, 640, 960)))
+DERIVATIVE_QUALITY = getattr(settings, 'IMAGE_DERIVATIVE_QUALITY', 80)
+# A re-upload may reuse a deleted file's name, so the record doesn't live forever.
+DERIVATIVE_CACHE_TIMEOUT = getattr(settings, 'IMAGE_DERIVATIVE_CACHE_TIMEOUT', 60 * 60 * 24)
+# While a job for an unrecorded image is pending, renders don't schedule another.
+DERIVATIVE_JOB_TIMEOUT = 5 * 60
+
+# (file extension, Pillow format, MIME type)
+DERIVATIVE_FORMATS = (
+    ('webp', 'WEBP', 'image/webp'),
+    ('jpg', 'JPEG', 'image/jpeg'),
+)
+
+
+def derivative_name(name, width, extension):
+    root, _ = posixpath.splitext(name)
+    return f'{root}.w{width}.{extension}'
+
+
+def derivative_widths(image_width):
+    """
+    Widths worth generating for an image; we never upscale.
+    """
+    return [width for width in DERIVATIVE_WIDTHS if width < image_width]
+
+
+def _widths_cache_key(name):
+    digest = hashlib.md5(name.encode(), usedforsecurity=False).hexdigest()
+    return f'image-derivatives:{digest}'
+
+
+def _record_widths(name, widths):
+    cache.set(_widths_cache_key(name), sorted(widths), DERIVATIVE_CACHE_TIMEOUT)
+
+
+def _complete(storage, name, width):
+    return all(
+        storage.exists(derivative_name(name, width, extension))
+        for extension, _, _ in DERIVATIVE_FORMATS
+    )
+
+
+def generate_derivatives(field_file, overwrite=False):
+    """
+    Write the WebP/JPEG variants of ``field_file`` and return their names.
+    Existing variants are kept unless ``overwrite`` is set.
+    """
+    storage = field_file.storage
+    written = []
+    with storage.open(field_file.name, 'rb') as source:
+        # Image.open only reads the header; nothing is decoded yet.
+        image = Image.open(source)
+        widths = derivative_widths(image.width)
+        if not widths or not overwrite and all(_complete(storage, field_file.name, width) for width in widths):
+            _record_widths(field_file.name, widths)
+            return written
+
+        # Let JPEG decode at a reduced scale when that is still big enough.
+        # Both sides are kept >= the widest variant in case EXIF rotates it.
+        image.draft('RGB', (max(widths), max(widths)))
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        widths = derivative_widths(image.width)
+
+        for width in sorted(widths, reverse=True):
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            for extension, image_format, _ in DERIVATIVE_FORMATS:
+                name = derivative_name(field_file.name, width, extension)
+                if storage.exists(name):
+                    if not overwrite:
+                        continue
+                    storage.delete(name)
+                buffer = io.BytesIO()
+                resized.save(buffer, image_format, quality=DERIVATIVE_QUALITY, optimize=True)
+                written.append(storage.save(name, ContentFile(buffer.getvalue())))
+    _record_widths(field_file.name, widths)
+    return written
+
+
+def available_derivatives(field_file):
+    """
+    Map each MIME type to its (width, url) variants, from the recorded widths.
+    """
+    storage = field_file.storage
+    key = _widths_cache_key(field_file.name)
+    widths = cache.get(key)
+    if widths is None:
+        # Not recorded yet (still generating, or evicted). Only a finished
+        # job records widths, so serve the original and let one job, which
+        # finds existing variants without decoding, record them again.
+        if cache.add(f'{key}:scheduled', True, DERIVATIVE_JOB_TIMEOUT):
+            tasks.defer(generate_derivatives, field_file)
+        return {}
+    return {
+        mime_type: [(width, storage.url(derivative_name(field_file.name, width, extension))) for width in widths]
+        for extension, _, mime_type in DERIVATIVE_FORMATS
+        if widths
+    }
+
+
+def delete_derivatives(storage, name):
+    """
+    Remove every variant of the image ``name`` and its recorded widths.
+    """
+    cache.delete(_widths_cache_key(name))
+    for width in DERIVATIVE_WIDTHS:
+        for extension, _, _ in DERIVATIVE_FORMATS:
+            storage.delete(derivative_name(name, width, extension))
+
+
+def generate_for_instance(model, pk, field_name, overwrite=False):
+    instance = model._default_manager.filter(pk=pk).first()
+    if instance is None:
+        return []
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return []
+    return generate_derivatives(field_file, overwrite=overwrite)
+
+
+def _image_change(field_file, loaded_name, raw, update_fields):
+    """
+    (changed, previous name) for an image field that is about to be saved.
+    """
+    if raw or (update_fields is not None and field_file.field.name not in update_fields):
+        return False, None
+    # A fresh upload is committed to storage during this save.
+    changed = (bool(field_file) and not field_file._committed) or (field_file.name or None) != (loaded_name or None)
+    return changed, loaded_name or None
+
+
+def _schedule(model, instance, field_name, changed, previous):
+    if not changed:
+        return
+    field_file = getattr(instance, field_name)
+    if previous and previous != field_file.name:
+        tasks.defer(delete_derivatives, field_file.storage, previous)
+    if field_file:
+        # A new upload under the old name must not keep the old variants.
+        overwrite = previous == field_file.name
+        tasks.defer(generate_for_instance, model, instance.pk, field_name, overwrite)
+
+
+@receiver(pre_save, sender=Movie)
+def check_thumbnail_changed(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._thumbnail_change = _image_change(
+        instance.thumbnail, getattr(instance, '_loaded_thumbnail_name', None), raw, update_fields,
+    )
+
+
+@receiver(pre_save, sender=UserInfo)
+def check_profile_changed(sender, instance, raw=False, update_fields=None, **kwargs):
+    loaded = getattr(instance, '_loaded_values', {})
+    instance._profile_change = _image_change(instance.profile, loaded.get('profile'), raw, update_fields)
+
+
+@receiver(post_save, sender=Movie)
+def schedule_thumbnail_derivatives(sender, instance, **kwargs):
+    _schedule(Movie, instance, 'thumbnail', *getattr(instance, '_thumbnail_change', (False, None)))
+
+
+@receiver(post_save, sender=UserInfo)
+def schedule_profile_derivatives(sender, instance, **kwargs):
+    _schedule(UserInfo, instance, 'profile', *getattr(instance, '_profile_change', (False, None)))
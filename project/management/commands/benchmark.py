@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import get_runner, override_settings, setup_test_environment, teardown_test_environment
+
+from project.benchmarks import BenchmarkRunner, compare, load_baseline, save_baseline
+from project.runner import ISOLATED_CACHES
+
+# Committed with the code, so every checkout and CI run compares against the same numbers.
+DEFAULT_BASELINE = Path(getattr(settings, 'BENCHMARK_BASELINE', Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'))
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark login, signup, the category list and category create/edit/delete "
+        "against a throwaway SQLite test database and a private cache, and compare with a stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help="Requests per scenario.")
+        parser.add_argument(
+            '--sizes', default='1000,100000,1000000',
+            help="Comma-separated category table sizes for the list scenarios.",
+        )
+        parser.add_argument(
+            '--baseline', type=Path, default=DEFAULT_BASELINE,
+            help="Baseline file; commit it (or point at a shared copy) so other machines compare against it.",
+        )
+        parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline.")
+        parser.add_argument(
+            '--threshold', type=float, default=0.25,
+            help="Allowed latency/throughput regression as a fraction (default 0.25).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = tuple(int(size) for size in options['sizes'].split(',') if size.strip())
+        except ValueError:
+            raise CommandError("--sizes must be a comma-separated list of integers.")
+        if options['requests'] < 1:
+            raise CommandError("--requests must be at least 1.")
+
+        # A throwaway database and a private cache: the scenarios clear and
+        # fill the cache, which must not touch real sessions or counters.
+        with override_settings(CACHES=ISOLATED_CACHES):
+            setup_test_environment()
+            test_runner = get_runner(settings)(verbosity=0, interactive=False)
+            old_config = test_runner.setup_databases()
+            try:
+                results = BenchmarkRunner(options['requests'], sizes, stdout=self.stdout).run()
+            finally:
+                test_runner.teardown_databases(old_config)
+                teardown_test_environment()
+
+        if options['save_baseline']:
+            save_baseline(options['baseline'], results)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['baseline']}"))
+            return
+
+        baseline = load_baseline(options['baseline'])
+        if not baseline:
+            self.stdout.write(f"No baseline at {options['baseline']}; run with --save-baseline to create one.")
+            return
+
+        regressions = compare(results, baseline, options['threshold'])
+        if regressions:
+            raise CommandError("Performance regressed:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from project.recommendations import MAX_ITEMS_PER_USER, PAIR_CHUNK, TOP_K, build_similarities
+
+
+class Command(BaseCommand):
+    help = "Rebuild the movie similarity table from watch history."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=TOP_K, help="Neighbours kept per movie.")
+        parser.add_argument('--max-items-per-user', type=int, default=MAX_ITEMS_PER_USER)
+        parser.add_argument('--pair-chunk', type=int, default=PAIR_CHUNK,
+                            help="Movie pairs expanded at once; lower it to use less memory.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        written = build_similarities(
+            top_k=options['top_k'],
+            max_items_per_user=options['max_items_per_user'],
+            pair_chunk=options['pair_chunk'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {written} similarities in {time.perf_counter() - start:.1f}s."
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from project.bulk import FORMATS, KINDS, export_rows
+
+
+class Command(BaseCommand):
+    help = "Stream all categories or movies to a CSV or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=KINDS)
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--output', help="Defaults to standard output.")
+
+    def handle(self, *args, **options):
+        rows = export_rows(options['kind'], options['format'])
+        if options['output'] is None:
+            for chunk in rows:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8', newline='') as file:
+            file.writelines(rows)
+        self.stdout.write(self.style.SUCCESS(f"Exported {options['kind']} to {options['output']}."))
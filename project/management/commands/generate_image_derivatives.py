@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from project.images import generate_derivatives
+from project.models import Movie, UserInfo
+
+
+class Command(BaseCommand):
+    help = "Generate responsive WebP/JPEG variants for movie thumbnails and profile pictures."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--overwrite', action='store_true', help="Regenerate variants that already exist.")
+
+    def handle(self, *args, **options):
+        written = 0
+        sources = (
+            (Movie.objects.exclude(thumbnail='').exclude(thumbnail=None), 'thumbnail'),
+            (UserInfo.objects.exclude(profile='').exclude(profile=None), 'profile'),
+        )
+        for queryset, field_name in sources:
+            for instance in queryset.iterator(chunk_size=500):
+                try:
+                    written += len(generate_derivatives(getattr(instance, field_name), overwrite=options['overwrite']))
+                except (OSError, ValueError) as error:
+                    self.stderr.write(f"Skipping {instance}: {error}")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} image variants."))
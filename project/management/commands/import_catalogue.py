@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from project.bulk import FORMATS, IMPORT_BATCH_SIZE, KINDS, ImportFailed, guess_format, import_file
+
+
+class Command(BaseCommand):
+    help = "Import categories or movies from a CSV or JSON Lines file in a single transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=KINDS)
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or guess_format(options['path'])
+        try:
+            with open(options['path'], 'rb') as file:
+                created = import_file(options['kind'], file, file_format, options['batch_size'])
+        except OSError as error:
+            raise CommandError(error)
+        except ImportFailed as failure:
+            for line_number, message in failure.errors:
+                self.stderr.write(f"line {line_number}: {message}" if line_number else message)
+            raise CommandError("Nothing was imported.")
+        self.stdout.write(self.style.SUCCESS(f"Imported {created} {options['kind']}."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from project.search import install_search_index, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Create the movie full-text index if needed and rebuild it from the movie table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        install_search_index(using=options['database'])
+        if not rebuild_search_index(using=options['database']):
+            self.stdout.write("This database has no full-text index; search uses LIKE queries.")
+            return
+        self.stdout.write(self.style.SUCCESS("Movie search index rebuilt."))
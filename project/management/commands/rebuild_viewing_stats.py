@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from project.viewing_stats import rebuild_viewing_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute per-user viewing statistics from watch history."
+
+    def handle(self, *args, **options):
+        users, categories = rebuild_viewing_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt viewing stats for {users} users ({categories} user/category rows)."
+        ))
@@ -0,0 +1,143 @@
+"""
+Pure-Python probe for MP4/MOV (ISO base media) files.
+
+Only box headers are read while walking the file: every other box is
+skipped with a seek, so probing a multi-GB file touches a few kilobytes.
+The probe finds the ``moov`` box, reads the duration from its ``mvhd``
+child, and records where ``moov`` sits so the stream view can point
+players at it.
+
+Probing runs in the background pool after a movie's video file changes.
+"""
+import math
+import struct
+from typing import NamedTuple
+
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from project import tasks
+from project.catalogue import bump_table
+from project.models import Movie
+
+# Stop walking after this many boxes; real files have a handful per level.
+MAX_BOXES = 1024
+
+
+class ProbeError(Exception):
+    pass
+
+
+class ProbeResult(NamedTuple):
+    duration_seconds: float
+    moov_offset: int
+    moov_size: int
+
+    @property
+    def duration_minutes(self):
+        return max(1, math.ceil(self.duration_seconds / 60))
+
+
+def _read_exact(file, size):
+    data = file.read(size)
+    if len(data) != size:
+        raise ProbeError('Unexpected end of file.')
+    return data
+
+
+def iter_boxes(file, start, end):
+    """
+    Yield (type, offset, header size, total size) for the boxes in [start, end).
+    """
+    offset = start
+    for _ in range(MAX_BOXES):
+        if offset + 8 > end:
+            return
+        file.seek(offset)
+        size, box_type = struct.unpack('>I4s', _read_exact(file, 8))
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', _read_exact(file, 8))[0]
+            header = 16
+        elif size == 0:
+            # Box runs to the end of the enclosing container.
+            size = end - offset
+        if size < header or offset + size > end:
+            raise ProbeError(f'Corrupt {box_type!r} box at offset {offset}.')
+        yield box_type, offset, header, size
+        offset += size
+    raise ProbeError('Too many boxes.')
+
+
+def _mvhd_duration(file, offset, header):
+    file.seek(offset + header)
+    version = _read_exact(file, 4)[0]
+    if version == 1:
+        timescale, duration = struct.unpack('>16xIQ', _read_exact(file, 28))
+    else:
+        timescale, duration = struct.unpack('>8xII', _read_exact(file, 16))
+    if not timescale:
+        raise ProbeError('mvhd has a zero timescale.')
+    return duration / timescale
+
+
+def probe_mp4(file):
+    """
+    Probe an open binary file. Raises ProbeError if it isn't a usable MP4/MOV.
+    """
+    file.seek(0, 2)
+    file_size = file.tell()
+    for box_type, offset, header, size in iter_boxes(file, 0, file_size):
+        if box_type != b'moov':
+            continue
+        for child_type, child_offset, child_header, _ in iter_boxes(file, offset + header, offset + size):
+            if child_type == b'mvhd':
+                duration = _mvhd_duration(file, child_offset, child_header)
+                return ProbeResult(duration, offset, size)
+        raise ProbeError('moov box has no mvhd.')
+    raise ProbeError('No moov box found.')
+
+
+def probe_movie(pk):
+    """
+    Probe a movie's video file and store the moov location, filling in the
+    duration if it was left empty. Returns the ProbeResult or None.
+    """
+    movie = Movie.objects.filter(pk=pk).only('video_file').first()
+    if movie is None or not movie.video_file:
+        return None
+    name = movie.video_file.name
+    try:
+        with movie.video_file.open('rb') as file:
+            result = probe_mp4(file)
+    except (OSError, ProbeError):
+        result = None
+
+    # Only touch the row if the file wasn't replaced while we were reading.
+    rows = Movie.objects.filter(pk=pk, video_file=name)
+    if result is None:
+        rows.update(moov_offset=None, moov_size=None)
+        return None
+    rows.update(moov_offset=result.moov_offset, moov_size=result.moov_size)
+    if rows.filter(duration_minutes=0).update(duration_minutes=result.duration_minutes):
+        bump_table(Movie)
+    return result
+
+
+@receiver(pre_save, sender=Movie)
+def check_video_changed(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'video_file' not in update_fields):
+        instance._probe_video = False
+        return
+    video = instance.video_file
+    instance._probe_video = bool(video) and (
+        # A fresh upload is committed to storage during this save.
+        not video._committed
+        or video.name != getattr(instance, '_loaded_video_name', None)
+    )
+
+
+@receiver(post_save, sender=Movie)
+def schedule_video_probe(sender, instance, **kwargs):
+    if getattr(instance, '_probe_video', False):
+        tasks.defer(probe_movie, instance.pk)
@@ -0,0 +1,215 @@
+"""
+Per-view request metrics, exported in Prometheus text format.
+
+RequestMetricsMiddleware records wall time, query count and DB time per
+resolved URL name, and flags likely N+1 patterns: requests in which the
+same SQL shape runs METRICS_NPLUSONE_THRESHOLD times or more.
+
+Queries are counted by a single execute wrapper installed on every database
+connection. The wrapper reads the active request from a context variable,
+so async views are covered too. Outside a request it does nothing.
+Aggregates are per process; each worker serves its own numbers.
+"""
+import bisect
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+NPLUSONE_THRESHOLD = getattr(settings, 'METRICS_NPLUSONE_THRESHOLD', 5)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+PLACEHOLDER_LIST_RE = re.compile(r'(%s|\?)(\s*,\s*(%s|\?))+')
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(**labels):
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels.items()
+    )
+    return ','.join(f'{name}="{value}"' for name, value in escaped)
+
+
+class Registry:
+    """
+    Thread-safe store of histograms and counters keyed by (metric, view).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._help = {}
+
+    def observe(self, metric, view, value, buckets, help_text=''):
+        with self._lock:
+            histogram = self._histograms.get((metric, view))
+            if histogram is None:
+                histogram = self._histograms[(metric, view)] = Histogram(buckets)
+                self._help.setdefault(metric, help_text)
+            histogram.observe(value)
+
+    def increment(self, metric, view, amount=1, help_text=''):
+        with self._lock:
+            self._counters[(metric, view)] = self._counters.get((metric, view), 0) + amount
+            self._help.setdefault(metric, help_text)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for metric in sorted({metric for metric, _ in self._histograms}):
+                lines.append(f'# HELP {metric} {self._help[metric]}')
+                lines.append(f'# TYPE {metric} histogram')
+                for (name, view), histogram in sorted(self._histograms.items()):
+                    if name != metric:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(float(bound))
+                        lines.append(f'{metric}_bucket{{{_labels(view=view, le=le)}}} {cumulative}')
+                    lines.append(f'{metric}_sum{{{_labels(view=view)}}} {histogram.sum}')
+                    lines.append(f'{metric}_count{{{_labels(view=view)}}} {histogram.count}')
+            for metric in sorted({metric for metric, _ in self._counters}):
+                lines.append(f'# HELP {metric} {self._help[metric]}')
+                lines.append(f'# TYPE {metric} counter')
+                for (name, view), value in sorted(self._counters.items()):
+                    if name == metric:
+                        lines.append(f'{metric}{{{_labels(view=view)}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class QueryRecorder:
+    __slots__ = ('count', 'duration', 'statements')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] = self.statements.get(sql, 0) + 1
+
+    def repeated_shapes(self, threshold=NPLUSONE_THRESHOLD):
+        """
+        SQL shapes that ran at least ``threshold`` times. ``IN (%s, %s)``
+        lists are collapsed so batches of different sizes count as one shape.
+        """
+        shapes = {}
+        for sql, count in self.statements.items():
+            shape = PLACEHOLDER_LIST_RE.sub('%s, ...', sql)
+            shapes[shape] = shapes.get(shape, 0) + count
+        return {shape: count for shape, count in shapes.items() if count >= threshold}
+
+
+_current_recorder = ContextVar('request_query_recorder', default=None)
+
+
+def record_queries(execute, sql, params, many, context):
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def _install(connection):
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    _install(connection)
+
+
+for _connection in connections.all(initialized_only=True):
+    _install(_connection)
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        token = _current_recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        self.record(request, time.perf_counter() - start, recorder)
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        token = _current_recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        self.record(request, time.perf_counter() - start, recorder)
+        return response
+
+    def record(self, request, elapsed, recorder):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+
+        registry.observe('movies_request_duration_seconds', view, elapsed, LATENCY_BUCKETS,
+                         'Wall time spent in the view and middleware.')
+        registry.observe('movies_request_queries', view, recorder.count, QUERY_COUNT_BUCKETS,
+                         'Database queries run per request.')
+        registry.observe('movies_request_db_duration_seconds', view, recorder.duration, LATENCY_BUCKETS,
+                         'Time spent waiting on the database per request.')
+
+        repeated = recorder.repeated_shapes()
+        if repeated:
+            registry.increment('movies_request_nplusone_total', view, help_text='Requests that repeated one SQL shape.')
+            shape, count = max(repeated.items(), key=lambda item: item[1])
+            logger.warning('Possible N+1 in %s: %d runs of %s', view, count, shape)
@@ -1,8 +1,12 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast, Round
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.utils.text import slugify
+from project.slugs import allocate_slugs
 
 class UserInfo(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='info')
@@ -13,17 +17,72 @@ class UserInfo(models.Model):
     def __str__(self):
         return f"{self.user.username}'s Info"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = self._current_values()
+
+    def _current_values(self):
+        return {
+            field.attname: self._comparable(field, getattr(self, field.attname))
+            for field in self._meta.concrete_fields
+        }
+
+    @staticmethod
+    def _comparable(field, value):
+        # File fields hold a FieldFile; the database holds its name (or '').
+        if isinstance(field, models.FileField):
+            return getattr(value, 'name', value) or None
+        return value
+
+    def changed_fields(self):
+        """
+        Names of the fields that differ from what was loaded or last saved.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return [field.name for field in self._meta.concrete_fields if not field.primary_key]
+        current = self._current_values()
+        return [
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.attname in loaded
+            and current[field.attname] != self._comparable(field, loaded[field.attname])
+        ]
+
 
 # --- Automatically create or update UserInfo when a User is saved ---
 @receiver(post_save, sender=User)
-def create_or_update_userinfo(sender, instance, created, **kwargs):
+def create_or_update_userinfo(sender, instance, created, update_fields=None, **kwargs):
     if created:
         UserInfo.objects.create(user=instance)
-    else:
-        instance.info.save()
-        # try:
-        # except UserInfo.DoesNotExist:
-        #     UserInfo.objects.create(user=instance)
+        return
+
+    # Django saves only last_login on every successful login.
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+
+    # A profile that was never loaded cannot have unsaved changes.
+    if not User.info.is_cached(instance):
+        return
+
+    try:
+        info = instance.info
+    except UserInfo.DoesNotExist:
+        info = None
+    if info is None or info.pk is None:
+        # Missing or deleted profile: create it instead of raising.
+        instance.info = UserInfo.objects.get_or_create(user=instance)[0]
+        return
+
+    changed = info.changed_fields()
+    if changed:
+        info.save(update_fields=changed)
 
 
 
@@ -36,7 +95,7 @@ class Category(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name)
+            allocate_slugs(Category, [self], 'name', using=kwargs.get('using'))
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -55,17 +114,59 @@ class Movie(models.Model):
     duration_minutes = models.PositiveIntegerField(help_text="Total duration of the movie in minutes")
     thumbnail = models.ImageField(upload_to='movies/thumbnails/', blank=True, null=True)
     video_file = models.FileField(upload_to='movies/videos/', blank=True, null=True)
+    # Where the MP4 'moov' box sits in video_file; filled in by the media probe.
+    moov_offset = models.PositiveBigIntegerField(blank=True, null=True, editable=False)
+    moov_size = models.PositiveBigIntegerField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'video_file' in field_names:
+            # The media probe only runs when this changes.
+            instance._loaded_video_name = values[field_names.index('video_file')] or ''
+        if 'thumbnail' in field_names:
+            # Image derivatives are only generated when this changes.
+            instance._loaded_thumbnail_name = values[field_names.index('thumbnail')] or ''
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.title)
+            allocate_slugs(Movie, [self], 'title', using=kwargs.get('using'))
         super().save(*args, **kwargs)
+        self._loaded_video_name = self.video_file.name or ''
+        self._loaded_thumbnail_name = self.thumbnail.name or ''
 
     def __str__(self):
         return f"{self.title} ({self.release_year})"
 
 
+class WatchHistoryQuerySet(models.QuerySet):
+    def with_progress(self):
+        """
+        Annotate ``progress`` (percentage watched) in SQL, so reading
+        progress_percentage doesn't load each movie.
+        """
+        return self.annotate(progress=Case(
+            When(movie__duration_minutes__gt=0, then=Round(
+                Cast('watched_minutes', FloatField()) * 100 / F('movie__duration_minutes'), 2,
+            )),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ))
+
+    def continue_watching(self, user):
+        """
+        The user's started but unfinished titles, most recently watched first.
+        """
+        return (
+            self.filter(user=user, watched_minutes__gt=0, watched_minutes__lt=F('movie__duration_minutes'))
+            .select_related('movie', 'movie__category')
+            .with_progress()
+            .order_by('-last_watched_at')
+        )
+
+
 class WatchHistory(models.Model):
     """
     Tracks how many minutes each user has watched of a movie.
@@ -75,19 +176,110 @@ class WatchHistory(models.Model):
     watched_minutes = models.PositiveIntegerField(default=0)
     last_watched_at = models.DateTimeField(auto_now=True)
 
+    objects = WatchHistoryQuerySet.as_manager()
+
     class Meta:
         unique_together = ('user', 'movie')
+        indexes = [models.Index(fields=['user', '-last_watched_at'], name='project_watch_recent_idx')]
         verbose_name_plural = "Watch History"
 
     def __str__(self):
         return f"{self.user.username} watched {self.watched_minutes} min of {self.movie.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'watched_minutes' in field_names:
+            # What the viewing stats currently count for this row.
+            instance._loaded_minutes = values[field_names.index('watched_minutes')]
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_minutes = self.watched_minutes
+
     @property
     def progress_percentage(self):
         """
         Returns how much of the movie the user has watched, as a percentage.
         """
+        if 'progress' in self.__dict__:
+            # Annotated by with_progress().
+            return self.progress
         if self.movie.duration_minutes > 0:
             return round((self.watched_minutes / self.movie.duration_minutes) * 100, 2)
         return 0
 
+
+class MovieSimilarity(models.Model):
+    """
+    Precomputed item-item neighbours from watch history.
+    Rebuilt in full by ``manage.py build_recommendations``.
+    """
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='similarities')
+    similar_movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='neighbour_of')
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ('movie', 'similar_movie')
+        indexes = [models.Index(fields=['movie', '-score'], name='project_similarity_rank_idx')]
+        verbose_name_plural = "Movie similarities"
+
+    def __str__(self):
+        return f"{self.movie_id} ~ {self.similar_movie_id} ({self.score:.3f})"
+
+
+class UserViewingStats(models.Model):
+    """
+    Per-user viewing totals, kept up to date incrementally from WatchHistory.
+    ``manage.py rebuild_viewing_stats`` recomputes them from scratch.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='viewing_stats')
+    minutes_watched = models.PositiveBigIntegerField(default=0)
+    titles_completed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "User viewing stats"
+
+    def __str__(self):
+        return f"{self.user_id}: {self.minutes_watched} min, {self.titles_completed} completed"
+
+
+class UserCategoryStats(models.Model):
+    """
+    Per-user, per-category viewing totals. Movies without a category only
+    count towards UserViewingStats.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='category_stats')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='user_stats')
+    minutes_watched = models.PositiveBigIntegerField(default=0)
+    titles_completed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'category')
+        verbose_name_plural = "User category stats"
+
+    def __str__(self):
+        return f"{self.user_id}/{self.category_id}: {self.minutes_watched} min"
+
+
+class ChunkedUpload(models.Model):
+    """
+    A resumable, chunk-by-chunk upload of a movie's video file.
+    Chunks are appended to ``path`` in storage; ``checksum`` is the running
+    CRC-32 of everything received so far.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='uploads')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploads')
+    filename = models.CharField(max_length=255)
+    path = models.CharField(max_length=500)
+    total_size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    next_chunk = models.PositiveIntegerField(default=0)
+    checksum = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.total_size} bytes)"
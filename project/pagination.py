@@ -0,0 +1,259 @@
+"""
+Paginators for dashboard lists.
+"""
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections, router, transaction
+from django.db.models import Max, QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+
+from project.models import Category, Movie
+
+ROW_COUNT_TIMEOUT = getattr(settings, 'PAGINATION_COUNT_CACHE_TIMEOUT', 300)
+ESTIMATE_THRESHOLD = getattr(settings, 'PAGINATION_ESTIMATE_THRESHOLD', 100_000)
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def encode_cursor(payload):
+    """
+    Turn a cursor payload into an opaque, URL-safe token.
+    """
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor('That cursor is not valid')
+    if not isinstance(payload, dict) or payload.get('d') not in ('n', 'p') or 'v' not in payload:
+        raise InvalidCursor('That cursor is not valid')
+    return payload
+
+
+class KeysetPage(Sequence):
+    """
+    One page of a KeysetPaginator. Quacks like a Django Page where it can,
+    but only knows its neighbours, not the total number of pages.
+    """
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, offset, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.offset = offset
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<Keyset page at offset %s>' % self.offset
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def start_index(self):
+        return self.offset + 1 if self.object_list else 0
+
+    def end_index(self):
+        return self.offset + len(self.object_list)
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return encode_cursor({
+            'v': self.paginator.key_for(self.object_list[-1]),
+            'd': 'n',
+            'o': self.end_index(),
+        })
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return encode_cursor({
+            'v': self.paginator.key_for(self.object_list[0]),
+            'd': 'p',
+            'o': max(self.offset - self.paginator.per_page, 0),
+        })
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination (``WHERE id > last_id LIMIT n``) for large tables.
+
+    Every page costs one indexed range scan, so deep pages are as cheap as the
+    first one and there is no ``COUNT(*)``. ``ordering`` must be a unique,
+    non-null column such as the primary key, optionally prefixed with ``-``.
+    """
+    def __init__(self, object_list, per_page, ordering='id'):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = ordering
+        self.descending = ordering.startswith('-')
+        self.field_name = ordering.lstrip('-')
+
+    def key_for(self, obj):
+        return getattr(obj, self.field_name)
+
+    def page(self, cursor=None):
+        if not cursor:
+            rows = list(self.object_list.order_by(self.ordering)[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], self, 0, len(rows) > self.per_page, False)
+
+        payload = decode_cursor(cursor)
+        value = self._cursor_value(payload['v'])
+        forward = payload['d'] == 'n'
+        offset = payload.get('o', 0)
+        if not isinstance(offset, int) or offset < 0:
+            offset = 0
+
+        # Walking forward on an ascending list means "greater than"; every
+        # other combination flips the comparison and/or the ordering.
+        lookup = 'gt' if forward != self.descending else 'lt'
+        ordering = self.ordering if forward else self._reversed_ordering()
+        queryset = self.object_list.filter(**{f'{self.field_name}__{lookup}': value})
+        rows = list(queryset.order_by(ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if forward:
+            return KeysetPage(rows, self, offset, has_more, True)
+        rows.reverse()
+        return KeysetPage(rows, self, offset, True, has_more)
+
+    def get_page(self, cursor=None):
+        """
+        Like page(), but fall back to the first page on a bad cursor.
+        """
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page(None)
+
+    def _cursor_value(self, value):
+        opts = self.object_list.model._meta
+        field = opts.pk if self.field_name == 'pk' else opts.get_field(self.field_name)
+        try:
+            value = field.to_python(value)
+        except ValidationError:
+            raise InvalidCursor('That cursor is not valid')
+        if value is None:
+            raise InvalidCursor('That cursor is not valid')
+        return value
+
+    def _reversed_ordering(self):
+        return self.field_name if self.descending else f'-{self.field_name}'
+
+
+def row_count_cache_key(model):
+    return f'rowcount:{model._meta.label_lower}'
+
+
+def estimate_row_count(model):
+    """
+    Cheap row-count estimate that never scans the table, or None.
+
+    PostgreSQL and MySQL keep planner statistics; everywhere else the highest
+    primary key is a good upper bound for auto-increment tables.
+    """
+    using = router.db_for_read(model)
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT TABLE_ROWS FROM information_schema.TABLES '
+                'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                [table],
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
+    if model._meta.pk.get_internal_type() not in ('AutoField', 'BigAutoField', 'SmallAutoField'):
+        return None
+    return model._default_manager.using(using).aggregate(top=Max('pk'))['top'] or 0
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that reads the row count of unfiltered lists from the cache.
+
+    Counts are kept up to date by the post_save/post_delete receivers below.
+    On a cache miss, tables estimated above PAGINATION_ESTIMATE_THRESHOLD
+    use the estimate instead of a full COUNT(*). Filtered querysets are
+    counted as usual.
+    """
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not self._is_whole_table(queryset):
+            return super().count
+
+        key = row_count_cache_key(queryset.model)
+        count = cache.get(key)
+        if count is None:
+            estimate = estimate_row_count(queryset.model)
+            if estimate is not None and estimate > ESTIMATE_THRESHOLD:
+                count = estimate
+            else:
+                count = queryset.count()
+            cache.set(key, count, ROW_COUNT_TIMEOUT)
+        return count
+
+    @staticmethod
+    def _is_whole_table(queryset):
+        if not isinstance(queryset, QuerySet):
+            return False
+        query = queryset.query
+        return not query.where and not query.is_sliced and not query.distinct and query.combinator is None
+
+
+def _adjust_row_count(model, delta):
+    try:
+        cache.incr(row_count_cache_key(model), delta)
+    except ValueError:
+        # Nothing cached yet; the next listing will count.
+        pass
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Movie)
+def count_created_row(sender, instance, created, using, **kwargs):
+    if created:
+        transaction.on_commit(lambda: _adjust_row_count(sender, 1), using=using)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Movie)
+def count_deleted_row(sender, instance, using, **kwargs):
+    transaction.on_commit(lambda: _adjust_row_count(sender, -1), using=using)
@@ -0,0 +1,221 @@
+"""
+Buffered ingestion of watch-progress heartbeats.
+
+Players report progress every few seconds. Instead of one upsert per
+heartbeat, each report overwrites a single shared cache entry per (user,
+movie), and the process that received it remembers the key; the keys are
+written with a single bulk upsert once there are enough of them, or
+FLUSH_INTERVAL seconds after the first pending heartbeat arrived. A daemon
+timer makes sure the latter happens even if no further heartbeat reaches
+this process.
+
+Because the value is read back from the cache at flush time, whichever
+worker flushes a key writes the newest progress for it, never a stale copy
+of its own. That needs a cache shared by every process (see CACHES in
+settings). A flush that fails is logged and dropped: the value stays in
+the cache and the player's next heartbeat queues it again.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from project.models import Movie, WatchHistory
+from project.viewing_stats import record_changes
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = getattr(settings, 'WATCH_PROGRESS_FLUSH_INTERVAL', 5)
+FLUSH_SIZE = getattr(settings, 'WATCH_PROGRESS_FLUSH_SIZE', 500)
+# How long a heartbeat waits in the cache; far longer than any flush takes.
+ENTRY_TIMEOUT = getattr(settings, 'WATCH_PROGRESS_CACHE_TIMEOUT', 60 * 60)
+KNOWN_MOVIE_TIMEOUT = 5 * 60
+
+# Primary keys are 64-bit; anything larger cannot name a row.
+MAX_PK = 2 ** 63 - 1
+
+
+def _entry_key(user_id, movie_id):
+    return f'progress:{user_id}:{movie_id}'
+
+
+def _clamp(minutes, duration):
+    # A duration of 0 is not known yet (the media probe fills it in later).
+    return min(minutes, duration) if duration else minutes
+
+
+def _known_movie_key(movie_id):
+    return f'progress:movie:{movie_id}'
+
+
+def accepts_movie(movie_id):
+    """
+    Whether heartbeats for ``movie_id`` should be buffered at all. Known
+    movies are remembered for a while, so steady heartbeats cost no query.
+    """
+    if not 0 < movie_id <= MAX_PK:
+        return False
+    key = _known_movie_key(movie_id)
+    if cache.get(key):
+        return True
+    if not Movie.objects.filter(pk=movie_id).exists():
+        return False
+    cache.set(key, True, KNOWN_MOVIE_TIMEOUT)
+    return True
+
+
+async def aaccepts_movie(movie_id):
+    """
+    Async accepts_movie(), for the async heartbeat endpoint.
+    """
+    if not 0 < movie_id <= MAX_PK:
+        return False
+    key = _known_movie_key(movie_id)
+    if await cache.aget(key):
+        return True
+    if not await Movie.objects.filter(pk=movie_id).aexists():
+        return False
+    await cache.aset(key, True, KNOWN_MOVIE_TIMEOUT)
+    return True
+
+
+class ProgressBuffer:
+    """
+    Latest-value-wins buffer of WatchHistory progress, kept in the shared cache.
+    """
+    def __init__(self, flush_interval=FLUSH_INTERVAL, flush_size=FLUSH_SIZE):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        # (user_id, movie_id) pairs this process has to flush.
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._timer = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, user_id, movie_id, watched_minutes):
+        """
+        Buffer a heartbeat without touching the database.
+        Returns True if a flush is now due.
+        """
+        cache.set(_entry_key(user_id, movie_id), watched_minutes, ENTRY_TIMEOUT)
+        with self._lock:
+            if not self._pending:
+                self._start_timer()
+            self._pending.add((user_id, movie_id))
+            return (
+                len(self._pending) >= self.flush_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+
+    def add(self, user_id, movie_id, watched_minutes):
+        if self.record(user_id, movie_id, watched_minutes):
+            self.flush()
+
+    def clear(self):
+        with self._lock:
+            self._pending = set()
+            self._cancel_timer()
+
+    def _start_timer(self):
+        # Called with the lock held, whenever the buffer stops being empty.
+        self._cancel_timer()
+        self._timer = threading.Timer(self.flush_interval, self._timed_flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _timed_flush(self):
+        try:
+            self.flush()
+        finally:
+            # This thread's connection would otherwise stay open.
+            connection.close()
+
+    def flush(self):
+        """
+        Write everything buffered so far with one bulk upsert.
+        Returns the number of rows written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            self._last_flush = time.monotonic()
+            self._cancel_timer()
+        if not pending:
+            return 0
+
+        try:
+            return self._write(pending)
+        except Exception:
+            # Not retried: a bad row would fail every later flush too.
+            logger.exception('Dropped %d buffered watch progress entries', len(pending))
+            return 0
+
+    def _write(self, pending):
+        movie_ids = {movie_id for _, movie_id in pending}
+        movies = {
+            pk: (duration, category_id)
+            for pk, duration, category_id in Movie.objects.filter(pk__in=movie_ids).values_list(
+                'pk', 'duration_minutes', 'category_id',
+            )
+        }
+        # Heartbeats for deleted or unknown movies are dropped.
+        pending = [key for key in pending if key[1] in movies]
+        if not pending:
+            return 0
+
+        with transaction.atomic():
+            # The upsert sends no signals, so the viewing stats are fed here.
+            previous = {
+                (user_id, movie_id): minutes
+                for user_id, movie_id, minutes in WatchHistory.objects.select_for_update().filter(
+                    user_id__in={user_id for user_id, _ in pending},
+                    movie_id__in={movie_id for _, movie_id in pending},
+                ).values_list('user_id', 'movie_id', 'watched_minutes')
+            }
+            # Read once the rows are locked, so a concurrent flush of the same
+            # key cannot commit an older value after this one.
+            latest = cache.get_many([_entry_key(*key) for key in pending])
+            now = timezone.now()
+            rows = [
+                WatchHistory(
+                    user_id=user_id,
+                    movie_id=movie_id,
+                    watched_minutes=_clamp(latest[_entry_key(user_id, movie_id)], movies[movie_id][0]),
+                    last_watched_at=now,
+                )
+                for user_id, movie_id in pending
+                if _entry_key(user_id, movie_id) in latest
+            ]
+            WatchHistory.objects.bulk_create(
+                rows,
+                batch_size=self.flush_size,
+                update_conflicts=True,
+                unique_fields=['user', 'movie'],
+                update_fields=['watched_minutes', 'last_watched_at'],
+            )
+            record_changes(
+                (row.user_id, movies[row.movie_id][1], movies[row.movie_id][0],
+                 previous.get((row.user_id, row.movie_id), 0), row.watched_minutes)
+                for row in rows
+            )
+        return len(rows)
+
+
+progress_buffer = ProgressBuffer()
+
+
+@atexit.register
+def _flush_at_exit():
+    progress_buffer.flush()
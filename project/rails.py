@@ -0,0 +1,106 @@
+"""
+Per-category "Now Showing" rails for the home page.
+
+All rails are loaded with one windowed query, and only when a rail's cached
+template fragment is missing. Each rail's fragment is keyed by a version
+counter that is bumped whenever a movie in it, or its category, changes.
+"""
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from project.cache_versions import bump_version, get_versions
+from project.category_cache import category_cache
+from project.models import Category, Movie
+
+RAIL_SIZE = getattr(settings, 'HOME_RAIL_SIZE', 8)
+RAIL_CACHE_TIMEOUT = getattr(settings, 'HOME_RAIL_CACHE_TIMEOUT', 600)
+
+
+def rail_version_name(category_id):
+    return f'home-rail:{category_id}'
+
+
+class Rail:
+    def __init__(self, rails, category, version):
+        self._rails = rails
+        self.category = category
+        self.version = version
+
+    @property
+    def movies(self):
+        return self._rails.movies_for(self.category.pk)
+
+
+class HomeRails:
+    """
+    The rails for a list of categories. Movies are fetched lazily, for all
+    rails at once, the first time any rail asks for them.
+    """
+    def __init__(self, categories, size=RAIL_SIZE):
+        self.size = size
+        versions = get_versions([rail_version_name(category.pk) for category in categories])
+        self.rails = [
+            Rail(self, category, versions[rail_version_name(category.pk)])
+            for category in categories
+        ]
+        self._movies = None
+
+    def __iter__(self):
+        return iter(self.rails)
+
+    def __len__(self):
+        return len(self.rails)
+
+    def movies_for(self, category_id):
+        if self._movies is None:
+            self._movies = self._load()
+        return self._movies.get(category_id, [])
+
+    def _load(self):
+        category_ids = [rail.category.pk for rail in self.rails]
+        ranked = (
+            Movie.objects
+            .filter(category_id__in=category_ids)
+            .select_related('category')
+            .annotate(rail_position=Window(
+                RowNumber(),
+                partition_by=[F('category_id')],
+                order_by=[F('created_at').desc(), F('id').desc()],
+            ))
+            .filter(rail_position__lte=self.size)
+            .order_by('category_id', 'rail_position')
+        )
+        movies = {}
+        for movie in ranked:
+            movies.setdefault(movie.category_id, []).append(movie)
+        return movies
+
+
+def build_home_rails():
+    return HomeRails(category_cache.all())
+
+
+@receiver(pre_save, sender=Movie)
+def remember_rail_category(sender, instance, raw=False, **kwargs):
+    # A movie moving to another category changes two rails.
+    if instance.pk and not raw:
+        instance._previous_category_id = (
+            Movie.objects.filter(pk=instance.pk).values_list('category_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Movie)
+@receiver(post_delete, sender=Movie)
+def invalidate_movie_rails(sender, instance, using, **kwargs):
+    category_ids = {instance.category_id, getattr(instance, '_previous_category_id', None)}
+    for category_id in category_ids - {None}:
+        bump_version(rail_version_name(category_id), using=using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_rail(sender, instance, using, **kwargs):
+    bump_version(rail_version_name(instance.pk), using=using)
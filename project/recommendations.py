@@ -0,0 +1,183 @@
+"""
+Item-item "because you watched" recommendations.
+
+``build_similarities`` turns WatchHistory into a sparse user x movie matrix,
+weighted by how much of each movie the user watched (progress, 0..1), and
+computes cosine similarity between movie columns with vectorized NumPy:
+per user, every pair of watched movies contributes ``w_i * w_j`` to the
+pair's dot product. Only the best ``top_k`` neighbours per movie are kept,
+in MovieSimilarity, so a lookup is one indexed query.
+
+Pair expansion costs the sum of squared items per user, so each user's
+history is capped at their ``max_items_per_user`` most-watched movies and
+users are processed in chunks of at most ``pair_chunk`` pairs.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from project.models import Movie, MovieSimilarity, WatchHistory
+
+TOP_K = getattr(settings, 'RECOMMENDATION_TOP_K', 20)
+MAX_ITEMS_PER_USER = getattr(settings, 'RECOMMENDATION_MAX_ITEMS_PER_USER', 500)
+PAIR_CHUNK = getattr(settings, 'RECOMMENDATION_PAIR_CHUNK', 5_000_000)
+READ_CHUNK = 10_000
+WRITE_BATCH = 2_000
+
+
+def load_interactions():
+    """
+    Return (user ids, movie ids, weights) arrays for every watched movie.
+    """
+    rows = (
+        WatchHistory.objects
+        .filter(watched_minutes__gt=0, movie__duration_minutes__gt=0)
+        .values_list('user_id', 'movie_id', 'watched_minutes', 'movie__duration_minutes')
+        .iterator(chunk_size=READ_CHUNK)
+    )
+    data = np.fromiter(rows, dtype=np.dtype((np.int64, 4))).reshape(-1, 4)
+    weights = np.clip(data[:, 2] / data[:, 3], 0.0, 1.0)
+    return data[:, 0], data[:, 1], weights
+
+
+def _runs(groups):
+    """
+    (start, length) of every run of equal values in sorted ``groups``.
+    """
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    return starts, np.diff(np.r_[starts, len(groups)])
+
+
+def _rank_within_runs(groups):
+    starts, lengths = _runs(groups)
+    return np.arange(len(groups)) - np.repeat(starts, lengths)
+
+
+def cap_per_user(users, items, weights, cap):
+    """
+    Keep each user's ``cap`` most-watched items. The result is sorted by user.
+    """
+    order = np.lexsort((-weights, users))
+    users, items, weights = users[order], items[order], weights[order]
+    keep = _rank_within_runs(users) < cap
+    return users[keep], items[keep], weights[keep]
+
+
+def _pairs(items, weights, starts, lengths):
+    """
+    Every unordered pair of entries within each run, as (low item, high item, w_i * w_j).
+    """
+    entry_lengths = np.repeat(lengths, lengths)
+    entry_starts = np.repeat(starts, lengths)
+    entries = np.arange(starts[0], starts[0] + len(entry_lengths))
+    offsets = np.cumsum(entry_lengths) - entry_lengths
+    left = np.repeat(entries, entry_lengths)
+    right = np.repeat(entry_starts, entry_lengths) + np.arange(len(left)) - np.repeat(offsets, entry_lengths)
+    upper = left < right
+    left, right = left[upper], right[upper]
+    return (
+        np.minimum(items[left], items[right]),
+        np.maximum(items[left], items[right]),
+        weights[left] * weights[right],
+    )
+
+
+def _sum_by_key(keys, values):
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(inverse, weights=values)
+
+
+def co_occurrence(users, items, weights, n_items, pair_chunk=PAIR_CHUNK):
+    """
+    Sparse item-item dot products, as (keys, values) with ``key = i * n_items + j``
+    and ``i < j``. ``users`` must be sorted; ``items`` are dense indices.
+    """
+    keys, values = np.empty(0, dtype=np.int64), np.empty(0)
+    starts, lengths = _runs(users)
+    cumulative = np.cumsum(lengths * lengths)
+    first = 0
+    while first < len(starts):
+        done = cumulative[first - 1] if first else 0
+        # A single user above the chunk size still makes a chunk of its own.
+        last = max(first + 1, int(np.searchsorted(cumulative, done + pair_chunk, side='right')))
+        low, high, products = _pairs(items, weights, starts[first:last], lengths[first:last])
+        keys, values = _sum_by_key(np.r_[keys, low * n_items + high], np.r_[values, products])
+        first = last
+    return keys, values
+
+
+def top_neighbours(keys, dots, norms, n_items, top_k=TOP_K):
+    """
+    Cosine similarity of each item's ``top_k`` best neighbours, as
+    (item, neighbour, score) arrays sorted by item then score.
+    """
+    low, high = keys // n_items, keys % n_items
+    scores = dots / (norms[low] * norms[high])
+    # Similarity is symmetric: each pair is a neighbour of both its items.
+    items, neighbours, scores = np.r_[low, high], np.r_[high, low], np.r_[scores, scores]
+    order = np.lexsort((neighbours, -scores, items))
+    items, neighbours, scores = items[order], neighbours[order], scores[order]
+    keep = _rank_within_runs(items) < top_k
+    return items[keep], neighbours[keep], scores[keep]
+
+
+def compute_similarities(user_ids, movie_ids, weights, top_k=TOP_K,
+                         max_items_per_user=MAX_ITEMS_PER_USER, pair_chunk=PAIR_CHUNK):
+    """
+    (movie ids, similar movie ids, scores) for the given interactions.
+    """
+    if not len(user_ids):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    users, movies, weights = cap_per_user(user_ids, movie_ids, weights, max_items_per_user)
+    movie_index, items = np.unique(movies, return_inverse=True)
+    n_items = len(movie_index)
+    norms = np.sqrt(np.bincount(items, weights=weights * weights, minlength=n_items))
+    keys, dots = co_occurrence(users, items, weights, n_items, pair_chunk)
+    items, neighbours, scores = top_neighbours(keys, dots, norms, n_items, top_k)
+    return movie_index[items], movie_index[neighbours], scores
+
+
+def build_similarities(top_k=TOP_K, max_items_per_user=MAX_ITEMS_PER_USER, pair_chunk=PAIR_CHUNK):
+    """
+    Replace MovieSimilarity with neighbours computed from all watch history.
+    Returns the number of rows written.
+    """
+    movies, similar, scores = compute_similarities(
+        *load_interactions(), top_k=top_k, max_items_per_user=max_items_per_user, pair_chunk=pair_chunk,
+    )
+    with transaction.atomic():
+        MovieSimilarity.objects.all().delete()
+        for start in range(0, len(movies), WRITE_BATCH):
+            end = start + WRITE_BATCH
+            MovieSimilarity.objects.bulk_create([
+                MovieSimilarity(movie_id=movie, similar_movie_id=other, score=score)
+                for movie, other, score in zip(
+                    movies[start:end].tolist(), similar[start:end].tolist(), scores[start:end].tolist(),
+                )
+            ])
+    return len(movies)
+
+
+def similar_movies(movie, limit=TOP_K, exclude_watched_by=None):
+    """
+    The movies most similar to ``movie``, best first, in one query.
+    """
+    movies = (
+        Movie.objects
+        .filter(neighbour_of__movie=movie)
+        .select_related('category')
+        .order_by('-neighbour_of__score')
+    )
+    if exclude_watched_by is not None:
+        movies = movies.exclude(watch_history__user=exclude_watched_by)
+    return list(movies[:limit])
+
+
+def because_you_watched(user, limit=8):
+    """
+    (last watched movie, similar movies the user has not seen), or (None, []).
+    """
+    last = WatchHistory.objects.filter(user=user).select_related('movie').order_by('-last_watched_at').first()
+    if last is None:
+        return None, []
+    return last.movie, similar_movies(last.movie, limit, exclude_watched_by=user)
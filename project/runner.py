@@ -0,0 +1,27 @@
+"""
+Test runner that keeps tests away from the configured cache.
+
+Tests clear and fill the cache freely; against the real CACHES that would
+flush the Redis database in REDIS_URL. Every run gets a private
+LocMemCache instead; ``manage.py benchmark`` uses the same one.
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+ISOLATED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'isolated',
+    }
+}
+
+
+class IsolatedCacheRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        self._caches = override_settings(CACHES=ISOLATED_CACHES)
+        self._caches.enable()
+        super().setup_test_environment(**kwargs)
+
+    def teardown_test_environment(self, **kwargs):
+        super().teardown_test_environment(**kwargs)
+        self._caches.disable()
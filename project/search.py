@@ -0,0 +1,143 @@
+"""
+Full-text movie search backed by an SQLite FTS5 index.
+
+``project_movie_fts`` is an external-content FTS5 table over
+``Movie.title`` and ``Movie.description``. Triggers on ``project_movie``
+keep it in sync, so bulk inserts and queryset updates are indexed too.
+Other database backends fall back to ``icontains`` lookups.
+"""
+import re
+
+from django.db import DatabaseError, connections, router
+from django.db.models import Q
+
+from project.models import Movie
+
+FTS_TABLE = 'project_movie_fts'
+MAX_TERMS = 10
+
+# title hits rank ten times higher than description hits
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+INDEX_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='project_movie', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON project_movie BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON project_movie BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description ON project_movie BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+
+def _connection():
+    return connections[router.db_for_read(Movie)]
+
+
+def install_search_index(using='default', **kwargs):
+    """
+    Create the FTS5 table and its triggers. Connected to post_migrate.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        existed = cursor.fetchone() is not None
+        try:
+            for statement in INDEX_SQL:
+                cursor.execute(statement)
+        except DatabaseError:
+            # SQLite was built without FTS5; search() falls back to LIKE.
+            return
+        if not existed:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def rebuild_search_index(using='default'):
+    """
+    Re-read every movie into the index. Returns False when there is no index.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def build_match_query(text):
+    """
+    Turn free text into an FTS5 query where every word is a prefix term,
+    e.g. ``star wa`` -> ``"star"* "wa"*`` (all terms must match).
+    """
+    terms = re.findall(r'\w+', text or '')[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_movies(text, category=None, limit=50):
+    """
+    Return up to ``limit`` movies matching ``text``, best match first,
+    optionally restricted to one category.
+    """
+    match = build_match_query(text)
+    if not match:
+        return []
+
+    if _connection().vendor == 'sqlite':
+        try:
+            return _search_fts(match, category, limit)
+        except DatabaseError:
+            pass
+    return _search_like(text, category, limit)
+
+
+def _search_fts(match, category, limit):
+    sql = (
+        f"SELECT {FTS_TABLE}.rowid FROM {FTS_TABLE} "
+        f"JOIN project_movie ON project_movie.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH %s"
+    )
+    params = [match]
+    if category is not None:
+        sql += " AND project_movie.category_id = %s"
+        params.append(category.pk)
+    sql += f" ORDER BY bm25({FTS_TABLE}, %s, %s) LIMIT %s"
+    params += [TITLE_WEIGHT, DESCRIPTION_WEIGHT, limit]
+
+    with _connection().cursor() as cursor:
+        cursor.execute(sql, params)
+        ids = [row[0] for row in cursor.fetchall()]
+
+    movies = Movie.objects.select_related('category').in_bulk(ids)
+    return [movies[pk] for pk in ids if pk in movies]
+
+
+def _search_like(text, category, limit):
+    queryset = Movie.objects.select_related('category')
+    for term in re.findall(r'\w+', text)[:MAX_TERMS]:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+    if category is not None:
+        queryset = queryset.filter(category=category)
+    return list(queryset.order_by('title')[:limit])
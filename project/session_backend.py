@@ -0,0 +1,68 @@
+"""
+Cached, database-backed sessions that skip writes which change nothing.
+
+Reads come from the cache first (as with Django's cached_db engine). A
+save only reaches the database when the session data differs from what was
+loaded, or when the row's expire_date hasn't been refreshed for
+SESSION_EXPIRY_REFRESH_INTERVAL seconds; a shared cache marker per session
+makes sure only one request per interval does that refresh. On SQLite this
+removes most session writes, and with them most write-lock contention.
+
+The database expire_date may therefore lag by up to one interval, so a
+sliding session can end that much earlier than SESSION_COOKIE_AGE. Like
+cached_db, this needs a cache shared by every process (see CACHES in settings).
+"""
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+EXPIRY_REFRESH_INTERVAL = getattr(settings, 'SESSION_EXPIRY_REFRESH_INTERVAL', 300)
+
+
+class SessionStore(CachedDBStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # Serialized data as last read from or written to the store.
+        self._stored = None
+
+    def _dump(self, data):
+        return self.serializer().dumps(data)
+
+    def _unchanged(self, must_create):
+        return (
+            not must_create
+            and self.session_key is not None
+            and self._stored is not None
+            and self._dump(self._get_session()) == self._stored
+        )
+
+    def _written_key(self, cache_key):
+        return f'{cache_key}:written'
+
+    def load(self):
+        data = super().load()
+        self._stored = self._dump(data)
+        return data
+
+    async def aload(self):
+        data = await super().aload()
+        self._stored = self._dump(data)
+        return data
+
+    def save(self, must_create=False):
+        # add() succeeds for one request per interval: that one refreshes expire_date.
+        if self._unchanged(must_create) and not self._cache.add(
+            self._written_key(self.cache_key), True, EXPIRY_REFRESH_INTERVAL,
+        ):
+            return
+        super().save(must_create)
+        self._cache.set(self._written_key(self.cache_key), True, EXPIRY_REFRESH_INTERVAL)
+        self._stored = self._dump(self._session)
+
+    async def asave(self, must_create=False):
+        if self._unchanged(must_create) and not await self._cache.aadd(
+            self._written_key(await self.acache_key()), True, EXPIRY_REFRESH_INTERVAL,
+        ):
+            return
+        await super().asave(must_create)
+        await self._cache.aset(self._written_key(await self.acache_key()), True, EXPIRY_REFRESH_INTERVAL)
+        self._stored = self._dump(self._session)
@@ -0,0 +1,91 @@
+"""
+Unique slug allocation for models with a ``slug`` field.
+
+Slugs for a whole batch of instances are resolved with one prefix query
+(chunked for very large batches) instead of a save-and-retry loop, so the
+same code serves single saves and ``bulk_create``. Colliding slugs get a
+numeric suffix: ``heat``, ``heat-2``, ``heat-3``.
+
+Two writers allocating the same new slug at the same moment can still
+collide; the unique constraint catches that and the write fails cleanly.
+"""
+import operator
+from functools import reduce
+
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Bases per query (up to three terms each); SQLite caps expression depth at 1000.
+PREFIX_QUERY_CHUNK = 200
+# Room kept at the end of a truncated slug for a "-<n>" suffix.
+SUFFIX_RESERVE = 8
+
+
+def _base_slug(value, max_length, fallback):
+    return slugify(value)[:max_length].strip('-') or fallback
+
+
+def _prefix_range(slug_field, prefix):
+    """
+    ``slug_field`` starts with ``prefix``, as a range an index can seek.
+    (``__startswith`` becomes a LIKE, which SQLite answers with a full scan.)
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f'{slug_field}__gte': prefix, f'{slug_field}__lt': upper})
+
+
+def _candidates(slug_field, base, max_length):
+    """
+    Match ``base`` itself and every slug it could turn into with a suffix.
+    """
+    if len(base) > max_length - SUFFIX_RESERVE:
+        # Suffixing will cut into the base, so match on the part that survives.
+        return _prefix_range(slug_field, base[:max_length - SUFFIX_RESERVE])
+    return Q(**{slug_field: base}) | _prefix_range(slug_field, f'{base}-')
+
+
+def _taken_slugs(model, slug_field, bases, max_length, using):
+    manager = model._default_manager.db_manager(using)
+    taken = set()
+    bases = sorted(bases)
+    for start in range(0, len(bases), PREFIX_QUERY_CHUNK):
+        condition = reduce(operator.or_, (
+            _candidates(slug_field, base, max_length)
+            for base in bases[start:start + PREFIX_QUERY_CHUNK]
+        ))
+        taken.update(manager.filter(condition).values_list(slug_field, flat=True))
+    return taken
+
+
+def allocate_slugs(model, instances, source_field, slug_field='slug', using=None):
+    """
+    Give every instance without a slug a unique one derived from
+    ``source_field``. Slugs already set on instances are kept and reserved.
+    """
+    max_length = model._meta.get_field(slug_field).max_length
+    fallback = model._meta.model_name
+    pending = []
+    reserved = set()
+    for instance in instances:
+        slug = getattr(instance, slug_field)
+        if slug:
+            reserved.add(slug)
+        else:
+            pending.append((instance, _base_slug(getattr(instance, source_field), max_length, fallback)))
+    if not pending:
+        return
+
+    bases = {base for _, base in pending}
+    taken = _taken_slugs(model, slug_field, bases, max_length, using) | reserved
+
+    next_suffix = {}
+    for instance, base in pending:
+        slug = base
+        number = next_suffix.get(base, 2)
+        while slug in taken:
+            suffix = f'-{number}'
+            slug = base[:max_length - len(suffix)] + suffix
+            number += 1
+        next_suffix[base] = number
+        taken.add(slug)
+        setattr(instance, slug_field, slug)
@@ -0,0 +1,202 @@
+"""
+Fingerprinted, precompressed static files, served in-process.
+
+CompressedManifestStaticFilesStorage adds content hashes to file names at
+``collectstatic`` time (via ManifestStaticFilesStorage) and then writes a
+``.gz`` copy, and a ``.br`` copy when the ``brotli`` package is installed,
+of every compressible file.
+
+PrecompressedStaticMiddleware serves STATIC_ROOT from a table built once
+per process. It sends the brotli or gzip copy when the client accepts
+it, and gives hashed names a far-future immutable Cache-Control. Requests it can't serve
+fall through to the rest of the stack, so ``runserver`` keeps working
+before collectstatic has run. Useful where no CDN or front-end server
+handles static files.
+"""
+import gzip
+import mimetypes
+import os
+import threading
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_etags
+
+try:
+    import brotli
+except ImportError:  # In requirements.txt; without it only .gz copies are written.
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.map', '.svg', '.json', '.txt', '.html', '.xml', '.ttf', '.eot'}
+MIN_COMPRESS_SIZE = 256
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'public, max-age=60'
+
+# Content-Encoding -> file suffix, best first.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _compress(path):
+    """
+    Write ``path.gz`` (and ``path.br``) if they are smaller than the original.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data)))
+    for suffix, compressed in variants:
+        if len(compressed) < len(data) * 0.95:
+            with open(path + suffix, 'wb') as file:
+                file.write(compressed)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # Templates must still render before collectstatic has run (tests, runserver).
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed = set()
+        for original, hashed, done in super().post_process(paths, dry_run, **options):
+            if done is True and hashed:
+                processed.update((original, hashed))
+            yield original, hashed, done
+        if dry_run:
+            return
+        for name in processed:
+            if os.path.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS and self.size(name) >= MIN_COMPRESS_SIZE:
+                _compress(self.path(name))
+
+
+class StaticAsset:
+    __slots__ = ('path', 'size', 'mtime', 'content_type', 'immutable', 'variants')
+
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        self.path = path
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.immutable = immutable
+        self.variants = {
+            encoding: (path + suffix, os.path.getsize(path + suffix))
+            for encoding, suffix in ENCODINGS
+            if os.path.exists(path + suffix)
+        }
+
+    def etag(self, encoding):
+        return f'"{int(self.mtime):x}-{self.size:x}{"-" + encoding if encoding else ""}"'
+
+
+def build_index(root):
+    """
+    {relative url path: StaticAsset} for every file under ``root``.
+    """
+    storage = CompressedManifestStaticFilesStorage(location=root)
+    hashed = set(storage.hashed_files.values())
+
+    index = {}
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            if filename.endswith(('.gz', '.br')) or filename == storage.manifest_name:
+                continue
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, root).replace(os.sep, '/')
+            index[name] = StaticAsset(path, immutable=name in hashed)
+    return index
+
+
+def accepted_encodings(header):
+    """
+    Content codings the client accepts (q > 0), from an Accept-Encoding header.
+    """
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        quality = params.strip()
+        if not coding:
+            continue
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    return accepted
+
+
+class PrecompressedStaticMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        self.prefix = '/' + settings.STATIC_URL.lstrip('/')
+        self.root = settings.STATIC_ROOT
+        self._index = None
+        self._lock = threading.Lock()
+
+    @property
+    def index(self):
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = build_index(self.root) if self.root and os.path.isdir(self.root) else {}
+        return self._index
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        response = self.serve(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        response = self.serve(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
+    def serve(self, request):
+        if request.method not in ('GET', 'HEAD') or not request.path.startswith(self.prefix):
+            return None
+        asset = self.index.get(request.path[len(self.prefix):])
+        if asset is None:
+            return None
+
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        encoding = next((coding for coding, _ in ENCODINGS if coding in asset.variants and coding in accepted), None)
+        path, size = asset.variants[encoding] if encoding else (asset.path, asset.size)
+        etag = asset.etag(encoding)
+
+        if_none_match = request.headers.get('If-None-Match', '')
+        if etag in parse_etags(if_none_match) or if_none_match.strip() == '*':
+            response = HttpResponseNotModified()
+        else:
+            if request.method == 'HEAD':
+                response = HttpResponse(content_type=asset.content_type)
+            else:
+                response = FileResponse(open(path, 'rb'), content_type=asset.content_type)
+            response['Content-Length'] = str(size)
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(asset.mtime)
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if asset.immutable else DEFAULT_CACHE_CONTROL
+        if asset.variants:
+            response['Vary'] = 'Accept-Encoding'
+        return response
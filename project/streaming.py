@@ -0,0 +1,171 @@
+"""
+Byte-range file streaming used for movie playback.
+
+Players seek by sending ``Range`` requests, so a seek only costs one small
+read instead of a full download. Files are read in fixed-size chunks,
+which keeps worker memory flat no matter how big the file is.
+"""
+import asyncio
+import mimetypes
+import os
+import re
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    """
+    Raised when a ``Range`` header does not overlap the file.
+    """
+
+
+def parse_range_header(header, size):
+    """
+    Parse a single ``bytes=start-end`` range into an inclusive (start, end) pair.
+
+    Returns None when the header is missing, invalid (``end < start``) or
+    asks for something we do not support (multiple ranges, other units); the
+    caller then serves the whole file, which RFC 9110 allows.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        # Syntactically invalid: RFC 9110 says to ignore the header.
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+def file_etag(stat_result):
+    return '"%x-%x"' % (stat_result.st_size, stat_result.st_mtime_ns)
+
+
+def if_range_matches(header, etag, last_modified):
+    """
+    ``If-Range`` only lets a range through when the validator still matches.
+    Weak ETags never match.
+    """
+    if not header:
+        return True
+    header = header.strip()
+    if header.startswith('"'):
+        return header == etag
+    if header.startswith('W/'):
+        return False
+    since = parse_http_date_safe(header)
+    return since is not None and since == int(last_modified)
+
+
+class FileRangeIterator:
+    """
+    Yield ``length`` bytes of ``path`` starting at ``start``, one chunk at a time.
+    """
+    def __init__(self, path, start, length, chunk_size=STREAM_CHUNK_SIZE):
+        self.path = path
+        self.start = start
+        self.length = length
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        with open(self.path, 'rb') as file:
+            file.seek(self.start)
+            remaining = self.length
+            while remaining > 0:
+                data = file.read(min(self.chunk_size, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+
+
+class AsyncFileRangeIterator(FileRangeIterator):
+    """
+    Same as FileRangeIterator, but blocking reads run in a worker thread so
+    the ASGI event loop is never held up by disk I/O.
+    """
+    def __aiter__(self):
+        return self._read()
+
+    async def _read(self):
+        file = await asyncio.to_thread(open, self.path, 'rb')
+        try:
+            await asyncio.to_thread(file.seek, self.start)
+            remaining = self.length
+            while remaining > 0:
+                data = await asyncio.to_thread(file.read, min(self.chunk_size, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+        finally:
+            await asyncio.to_thread(file.close)
+
+
+def ranged_file_response(request, path, content_type=None):
+    """
+    Build a 200/206/416 response for ``path`` honouring ``Range`` and ``If-Range``.
+    """
+    stat_result = os.stat(path)
+    size = stat_result.st_size
+    etag = file_etag(stat_result)
+    last_modified = stat_result.st_mtime
+
+    if content_type is None:
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    start, end = 0, size - 1
+    status = 200
+    if if_range_matches(request.headers.get('If-Range'), etag, last_modified):
+        try:
+            byte_range = parse_range_header(request.headers.get('Range'), size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            response['Accept-Ranges'] = 'bytes'
+            return response
+        if byte_range is not None:
+            start, end = byte_range
+            status = 206
+
+    length = end - start + 1 if size else 0
+    if request.method == 'HEAD':
+        response = HttpResponse(status=status, content_type=content_type)
+    else:
+        iterator_class = AsyncFileRangeIterator if isinstance(request, ASGIRequest) else FileRangeIterator
+        response = StreamingHttpResponse(
+            iterator_class(path, start, length),
+            status=status,
+            content_type=content_type,
+        )
+
+    response['Content-Length'] = str(length)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if status == 206:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
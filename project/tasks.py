@@ -0,0 +1,52 @@
+"""
+A small in-process worker pool for jobs that must stay off the request path
+(image resizing, media probing, ...).
+
+Jobs are handed over once the surrounding transaction commits, so they
+always see the rows that scheduled them. Set BACKGROUND_TASKS_EAGER = True
+to run jobs inline instead, e.g. in tests.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+WORKERS = getattr(settings, 'BACKGROUND_WORKERS', 2)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='project-task')
+        return _executor
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception('Background task %s failed', getattr(func, '__name__', func))
+    finally:
+        # Worker threads open their own connections; don't leak them.
+        connections.close_all()
+
+
+def submit(func, *args, **kwargs):
+    if getattr(settings, 'BACKGROUND_TASKS_EAGER', False):
+        return func(*args, **kwargs)
+    return _get_executor().submit(_run, func, args, kwargs)
+
+
+def defer(func, *args, **kwargs):
+    """
+    Run ``func(*args, **kwargs)`` in the pool after the current transaction commits.
+    """
+    transaction.on_commit(lambda: submit(func, *args, **kwargs))
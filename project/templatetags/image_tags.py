@@ -0,0 +1,39 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from project.images import available_derivatives
+
+register = template.Library()
+
+@register.simple_tag
+def responsive_image(image, alt='', sizes='100vw', css_class='', loading='lazy'):
+    """
+    Render an image with WebP/JPEG ``srcset`` variants when they exist,
+    falling back to the original upload.
+    """
+    if not image:
+        return ''
+
+    variants = available_derivatives(image)
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (mime_type, ', '.join(f'{url} {width}w' for width, url in candidates), sizes)
+            for mime_type, candidates in variants.items()
+            if mime_type != 'image/jpeg'
+        ),
+    )
+    fallback = variants.get('image/jpeg')
+    srcset = ', '.join(f'{url} {width}w' for width, url in fallback) if fallback else ''
+
+    if srcset:
+        img = format_html(
+            '<img src="{}" srcset="{}" sizes="{}" class="{}" alt="{}" loading="{}">',
+            image.url, srcset, sizes, css_class, alt, loading,
+        )
+    else:
+        img = format_html(
+            '<img src="{}" class="{}" alt="{}" loading="{}">',
+            image.url, css_class, alt, loading,
+        )
+    return format_html('<picture>{}{}</picture>', sources, img)
@@ -2,9 +2,48 @@ from django import template
 
 register = template.Library()
 
-@register.inclusion_tag('components/pagination.html')
-def render_pagination(page_obj, page_param='page'):
+# Pages shown either side of the current one.
+PAGE_NEIGHBOURS = 2
+
+
+def page_window(number, num_pages, neighbours=PAGE_NEIGHBOURS):
+    """
+    Page numbers to link to: the first page, the current page's neighbours
+    and the last page, with None where pages are skipped. Its length doesn't
+    depend on num_pages.
+    """
+    start = max(number - neighbours, 1)
+    end = min(number + neighbours, num_pages)
+    window = list(range(start, end + 1))
+    if start > 1:
+        window[:0] = [1] if start == 2 else [1, None]
+    if end < num_pages:
+        window += [num_pages] if end == num_pages - 1 else [None, num_pages]
+    return window
+
+
+def query_prefix(request, *replaced):
+    """
+    ``?`` plus the request's query string without ``replaced``, ready for
+    one more parameter, so page links keep the current filters.
+    """
+    if request is None:
+        return '?'
+    params = request.GET.copy()
+    for name in replaced:
+        params.pop(name, None)
+    query = params.urlencode()
+    return f'?{query}&' if query else '?'
+
+
+@register.inclusion_tag('components/pagination.html', takes_context=True)
+def render_pagination(context, page_obj, page_param='page', cursor_param='cursor'):
     return {
         'page_obj': page_obj,
         'page_param': page_param,
-    }
\ No newline at end of file
+        'cursor_param': cursor_param,
+        'query_prefix': query_prefix(context.get('request'), page_param, cursor_param),
+        'page_window': [] if getattr(page_obj, 'is_keyset', False) else page_window(
+            page_obj.number, page_obj.paginator.num_pages,
+        ),
+    }
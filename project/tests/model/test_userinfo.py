@@ -53,3 +53,36 @@ class UserInfoModelAndSignalTest(TestCase):
         updated_info = UserInfo.objects.get(user=self.user)
         self.assertEqual(updated_info.phone, '09123456789')
         self.assertEqual(updated_info.address, 'Yangon, Myanmar')
+
+
+class UserInfoSyncQueryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='syncuser', password='12345')
+        self.user = User.objects.get(pk=self.user.pk)
+
+    def test_last_login_save_skips_userinfo(self):
+        """update_last_login() saves only last_login; no UserInfo queries"""
+        self.user.info  # loaded, so only update_fields can skip the sync
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['last_login'])
+
+    def test_unchanged_profile_is_not_written(self):
+        self.user.info
+        self.user.first_name = 'Changed'
+        with self.assertNumQueries(1):
+            self.user.save()
+
+    def test_unloaded_profile_is_not_touched(self):
+        with self.assertNumQueries(1):
+            self.user.save()
+
+    def test_changed_profile_is_saved_with_user(self):
+        self.user.info.phone = '09123456789'
+        self.user.save()
+        self.assertEqual(UserInfo.objects.get(user=self.user).phone, '09123456789')
+
+    def test_missing_profile_created_without_raising(self):
+        UserInfo.objects.filter(user=self.user).delete()
+        user = User.objects.select_related('info').get(pk=self.user.pk)
+        user.save()
+        self.assertTrue(UserInfo.objects.filter(user=self.user).exists())
@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+from django.contrib.auth import authenticate
+from django.contrib.auth import hashers
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from project.backends import EMAIL_INDEX, EmailOrUsernameBackend
+
+
+class EmailOrUsernameBackendTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='moviefan', email='Fan@Example.com', password='StrongPass123'
+        )
+        self.backend = EmailOrUsernameBackend()
+
+    def count_hashes(self):
+        return patch.object(hashers, 'pbkdf2', wraps=hashers.pbkdf2)
+
+    def test_login_with_username(self):
+        self.assertEqual(authenticate(username='moviefan', password='StrongPass123'), self.user)
+
+    def test_login_with_email_ignores_case(self):
+        self.assertEqual(authenticate(username='fan@example.COM', password='StrongPass123'), self.user)
+
+    def test_lookup_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.backend.find_user('fan@example.com'), self.user)
+
+    def test_bad_password_runs_one_hash(self):
+        with self.count_hashes() as pbkdf2:
+            self.assertIsNone(authenticate(username='moviefan', password='wrong'))
+        self.assertEqual(pbkdf2.call_count, 1)
+
+    def test_unknown_identifier_runs_one_hash_and_is_cached(self):
+        with self.count_hashes() as pbkdf2:
+            self.assertIsNone(authenticate(username='nobody', password='whatever'))
+        self.assertEqual(pbkdf2.call_count, 1)
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(authenticate(username='nobody', password='whatever'))
+
+    def test_other_case_does_not_lock_out_username(self):
+        self.assertIsNone(authenticate(username='MovieFan', password='StrongPass123'))
+        self.assertEqual(authenticate(username='moviefan', password='StrongPass123'), self.user)
+
+    def test_new_account_clears_negative_cache(self):
+        self.assertIsNone(authenticate(username='newcomer', password='StrongPass123'))
+        User.objects.create_user(username='newcomer', password='StrongPass123')
+        self.assertIsNotNone(authenticate(username='newcomer', password='StrongPass123'))
+
+    def test_username_wins_over_email(self):
+        other = User.objects.create_user(username='fan@example.com', password='OtherPass123')
+        self.assertEqual(self.backend.find_user('fan@example.com'), other)
+
+    def test_shared_email_is_ambiguous(self):
+        User.objects.create_user(username='twin', email='fan@example.com', password='x')
+        self.assertIsNone(self.backend.find_user('FAN@example.com'))
+
+    def test_inactive_user_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(authenticate(username='moviefan', password='StrongPass123'))
+
+    def test_email_index_installed(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, User._meta.db_table)
+        self.assertIn(EMAIL_INDEX.name, constraints)
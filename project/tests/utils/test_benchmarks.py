@@ -0,0 +1,31 @@
+from django.test import TestCase
+from project.benchmarks import BenchmarkRunner, compare, percentile
+
+
+class BenchmarkHelpersTest(TestCase):
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 0.5), 50)
+        self.assertEqual(percentile(samples, 0.99), 99)
+        self.assertEqual(percentile([7], 0.99), 7)
+
+    def test_compare_flags_regressions(self):
+        baseline = {'login': {'rps': 100.0, 'p99_ms': 10.0, 'queries': 4}}
+        self.assertEqual(compare({'login': {'rps': 90.0, 'p99_ms': 11.0, 'queries': 4}}, baseline, 0.25), [])
+
+        regressions = compare({'login': {'rps': 50.0, 'p99_ms': 20.0, 'queries': 5}}, baseline, 0.25)
+        self.assertEqual(len(regressions), 3)
+
+    def test_runner_smoke(self):
+        results = BenchmarkRunner(requests=2, sizes=(30,)).run()
+        self.assertEqual(
+            set(results),
+            {
+                'login', 'signup', 'category_list[30]', 'category_list_deep[30]', 'category_list_cursor[30]',
+                'category_create', 'category_edit', 'category_delete',
+            },
+        )
+        for result in results.values():
+            self.assertEqual(result['requests'], 2)
+            self.assertGreater(result['rps'], 0)
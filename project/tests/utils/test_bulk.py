@@ -0,0 +1,86 @@
+import io
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from project.bulk import ImportFailed, import_file
+from project.models import Category, Movie
+from project.pagination import row_count_cache_key
+
+
+class BulkImportTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_rows_are_inserted_in_batches(self):
+        data = 'name\n' + ''.join(f'Genre {i}\n' for i in range(7))
+        with self.assertNumQueries(9):
+            # savepoint, existing names, three slug lookups and inserts of up to 3 rows, release
+            created = import_file('categories', io.BytesIO(data.encode()), 'csv', batch_size=3)
+        self.assertEqual(created, 7)
+
+    def test_duplicate_titles_get_distinct_slugs(self):
+        Movie.objects.create(title='Heat', release_year=1995, duration_minutes=170)
+        data = b'title,release_year,duration_minutes\nHeat,1986,100\nHeat,2013,92\nHeat,2019,80\n'
+        import_file('movies', io.BytesIO(data), 'csv', batch_size=2)
+        self.assertCountEqual(Movie.objects.values_list('slug', flat=True), ['heat', 'heat-2', 'heat-3', 'heat-4'])
+
+    def test_duplicates_in_file_and_table_are_rejected(self):
+        Category.objects.create(name='Drama')
+        data = b'name\nAction\nAction\nDrama\n'
+        with self.assertRaises(ImportFailed) as raised:
+            import_file('categories', io.BytesIO(data), 'csv')
+        self.assertEqual([line for line, _ in raised.exception.errors], [3, 4])
+        self.assertEqual(Category.objects.count(), 1)
+
+    def test_unknown_category_is_rejected(self):
+        data = b'{"title": "Alien", "category": "Horror", "release_year": 1979, "duration_minutes": 117}\n'
+        with self.assertRaises(ImportFailed) as raised:
+            import_file('movies', io.BytesIO(data), 'jsonl')
+        self.assertIn('Unknown category', raised.exception.errors[0][1])
+
+    def test_non_utf8_file_is_rejected(self):
+        data = 'name\nAction\nCom\xe9die\n'.encode('latin-1')
+        with self.assertRaises(ImportFailed) as raised:
+            import_file('categories', io.BytesIO(data), 'csv')
+        self.assertIn('UTF-8', raised.exception.errors[0][1])
+        self.assertFalse(Category.objects.exists())
+
+    def test_malformed_csv_is_rejected(self):
+        data = b'name\nAction\n"' + b'x' * 200_000 + b'"\n'
+        with self.assertRaises(ImportFailed) as raised:
+            import_file('categories', io.BytesIO(data), 'csv')
+        self.assertEqual(raised.exception.errors[0][0], 3)
+        self.assertIn('Malformed CSV', raised.exception.errors[0][1])
+
+    def test_cached_row_count_is_dropped(self):
+        cache.set(row_count_cache_key(Movie), 0)
+        data = b'title,release_year,duration_minutes\nHeat,1995,170\n'
+        with self.captureOnCommitCallbacks(execute=True):
+            import_file('movies', io.BytesIO(data), 'csv')
+        self.assertIsNone(cache.get(row_count_cache_key(Movie)))
+
+
+class CatalogueCommandTest(TestCase):
+
+    def test_export_then_import_round_trip(self):
+        Category.objects.create(name='Drama')
+        Category.objects.create(name='Sci-Fi')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'categories.jsonl')
+            call_command('export_catalogue', 'categories', format='jsonl', output=path, stdout=io.StringIO())
+            Category.objects.all().delete()
+            call_command('import_catalogue', 'categories', path, stdout=io.StringIO())
+        self.assertCountEqual(Category.objects.values_list('name', flat=True), ['Drama', 'Sci-Fi'])
+
+    def test_invalid_file_raises_command_error(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write('name\n\n \n')
+        try:
+            with self.assertRaises(CommandError):
+                call_command('import_catalogue', 'categories', file.name, stdout=io.StringIO(), stderr=io.StringIO())
+        finally:
+            os.unlink(file.name)
@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.test import TestCase
+from project.category_cache import category_cache
+from project.collectForms.movies_forms import MovieFilterForm
+from project.models import Category
+
+
+class CategoryCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        category_cache.clear()
+        self.drama = Category.objects.create(name='Drama')
+        self.action = Category.objects.create(name='Action')
+
+    def test_reads_are_free_once_loaded(self):
+        with self.assertNumQueries(1):
+            self.assertEqual([category.name for category in category_cache.all()], ['Action', 'Drama'])
+        with self.assertNumQueries(0):
+            self.assertEqual(category_cache.get(self.drama.pk), self.drama)
+            self.assertEqual(category_cache.id_for_slug('action'), self.action.pk)
+            self.assertIsNone(category_cache.id_for_slug('western'))
+
+    def test_saves_and_deletes_invalidate(self):
+        category_cache.all()
+        self.drama.name = 'Thriller'
+        self.drama.save()
+        self.assertEqual([category.name for category in category_cache.all()], ['Action', 'Thriller'])
+
+        self.action.delete()
+        self.assertEqual([category.name for category in category_cache.all()], ['Thriller'])
+
+    def test_other_processes_see_changes_through_the_shared_version(self):
+        category_cache.all()
+        # Another process saved a category: only the shared counter moved.
+        Category.objects.bulk_create([Category(name='Comedy', slug='comedy')])
+        cache.incr('version:table:project.category')
+        self.assertEqual(category_cache.id_for_slug('comedy'), Category.objects.get(name='Comedy').pk)
+
+
+class CachedCategoryChoiceFieldTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        category_cache.clear()
+        self.drama = Category.objects.create(name='Drama')
+
+    def test_choices_and_validation_use_the_cache(self):
+        category_cache.all()
+        with self.assertNumQueries(0):
+            form = MovieFilterForm({'category': str(self.drama.pk)})
+            self.assertTrue(form.is_valid())
+            self.assertEqual(form.cleaned_data['category'], self.drama)
+            html = str(form['category'])
+        self.assertIn('>Drama</option>', html)
+
+    def test_unknown_category_is_invalid(self):
+        form = MovieFilterForm({'category': '999'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('category', form.errors)
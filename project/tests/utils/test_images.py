@@ -0,0 +1,118 @@
+import io
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+from project.images import derivative_name, generate_derivatives
+from project.models import Movie
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_image(width, height, image_format='JPEG'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, BACKGROUND_TASKS_EAGER=True)
+class ImageDerivativeTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def create_movie(self, data, filename='poster.jpg'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Movie.objects.create(
+                title='Poster Test', release_year=2024, duration_minutes=100,
+                thumbnail=SimpleUploadedFile(filename, data, content_type='image/jpeg'),
+            )
+
+    def test_derivatives_generated_after_upload(self):
+        movie = self.create_movie(make_image(1200, 1800))
+        name = movie.thumbnail.name
+        for width in (320, 640, 960):
+            for extension in ('webp', 'jpg'):
+                derivative = derivative_name(name, width, extension)
+                self.assertTrue(default_storage.exists(derivative), derivative)
+
+        with default_storage.open(derivative_name(name, 320, 'webp')) as file:
+            self.assertEqual(Image.open(file).size, (320, 480))
+
+    def test_small_images_are_not_upscaled(self):
+        movie = self.create_movie(make_image(400, 600), filename='small.jpg')
+        self.assertTrue(default_storage.exists(derivative_name(movie.thumbnail.name, 320, 'jpg')))
+        self.assertFalse(default_storage.exists(derivative_name(movie.thumbnail.name, 640, 'jpg')))
+
+    def test_template_tag_emits_srcset(self):
+        movie = self.create_movie(make_image(1000, 1500), filename='tagged.jpg')
+        html = Template(
+            '{% load image_tags %}{% responsive_image movie.thumbnail alt="Poster" sizes="25vw" %}'
+        ).render(Context({'movie': movie}))
+
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn('.w320.webp 320w', html)
+        self.assertIn('.w960.jpg 960w', html)
+        self.assertIn('sizes="25vw"', html)
+        self.assertIn(f'src="{movie.thumbnail.url}"', html)
+
+    def test_template_tag_without_image(self):
+        html = Template('{% load image_tags %}{% responsive_image None %}').render(Context())
+        self.assertEqual(html, '')
+
+    def test_template_tag_reads_recorded_widths(self):
+        movie = self.create_movie(make_image(700, 1000), filename='recorded.jpg')
+        template = Template('{% load image_tags %}{% responsive_image movie.thumbnail %}')
+        with patch.object(FileSystemStorage, 'exists') as exists:
+            html = template.render(Context({'movie': movie}))
+        exists.assert_not_called()
+        self.assertIn('.w640.webp 640w', html)
+        self.assertNotIn('960w', html)
+
+        # Without a record the original is served until a job records the widths again.
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertNotIn('srcset', template.render(Context({'movie': movie})))
+        with patch.object(FileSystemStorage, 'exists') as exists:
+            self.assertEqual(template.render(Context({'movie': movie})), html)
+        exists.assert_not_called()
+
+    def test_existing_derivatives_are_not_decoded_again(self):
+        movie = self.create_movie(make_image(1000, 1500), filename='again.jpg')
+        with patch('project.images.ImageOps.exif_transpose') as transpose:
+            self.assertEqual(generate_derivatives(movie.thumbnail), [])
+        transpose.assert_not_called()
+
+    def test_only_image_changes_schedule_derivatives(self):
+        movie = self.create_movie(make_image(400, 600), filename='unchanged.jpg')
+        movie = Movie.objects.get(pk=movie.pk)
+        with patch('project.images.tasks.defer') as defer, self.captureOnCommitCallbacks(execute=True):
+            movie.title = 'Renamed'
+            movie.save()
+        defer.assert_not_called()
+
+        with patch('project.images.tasks.defer') as defer, self.captureOnCommitCallbacks(execute=True):
+            movie.thumbnail = SimpleUploadedFile('replaced.jpg', make_image(400, 600), content_type='image/jpeg')
+            movie.save()
+        self.assertEqual([call.args[0].__name__ for call in defer.call_args_list],
+                         ['delete_derivatives', 'generate_for_instance'])
+
+    def test_replacing_an_image_deletes_its_old_derivatives(self):
+        movie = self.create_movie(make_image(700, 1000), filename='old.jpg')
+        old = movie.thumbnail.name
+        with self.captureOnCommitCallbacks(execute=True):
+            movie.thumbnail = SimpleUploadedFile('new.jpg', make_image(700, 1000), content_type='image/jpeg')
+            movie.save()
+        self.assertFalse(default_storage.exists(derivative_name(old, 320, 'webp')))
+        self.assertTrue(default_storage.exists(derivative_name(movie.thumbnail.name, 320, 'webp')))
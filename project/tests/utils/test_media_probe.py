@@ -0,0 +1,134 @@
+import io
+import shutil
+import struct
+import tempfile
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from project.collectForms.movies_forms import MovieForm
+from project.media_probe import ProbeError, probe_mp4
+from project.models import Category, Movie
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def box(box_type, payload=b''):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def mvhd(timescale, duration, version=0):
+    if version == 1:
+        fields = struct.pack('>B3xQQIQ', 1, 0, 0, timescale, duration)
+    else:
+        fields = struct.pack('>B3xIIII', 0, 0, 0, timescale, duration)
+    return box(b'mvhd', fields + bytes(80))
+
+
+def mp4(moov_first=False, version=0, duration=5400):
+    ftyp = box(b'ftyp', b'isom\x00\x00\x02\x00isomiso2')
+    mdat = box(b'mdat', bytes(4096))
+    moov = box(b'moov', mvhd(1000, duration * 1000, version) + box(b'trak', bytes(32)))
+    return ftyp + (moov + mdat if moov_first else mdat + moov)
+
+
+class ProbeMp4Test(SimpleTestCase):
+
+    def test_moov_at_end(self):
+        data = mp4()
+        result = probe_mp4(io.BytesIO(data))
+        self.assertEqual(result.duration_seconds, 5400)
+        self.assertEqual(result.duration_minutes, 90)
+        self.assertEqual(data[result.moov_offset + 4:result.moov_offset + 8], b'moov')
+        self.assertEqual(result.moov_offset + result.moov_size, len(data))
+
+    def test_faststart_and_version_1(self):
+        result = probe_mp4(io.BytesIO(mp4(moov_first=True, version=1, duration=61)))
+        self.assertEqual(result.duration_minutes, 2)
+        self.assertEqual(result.moov_offset, 24)
+
+    def test_64bit_box_size(self):
+        large_mdat = struct.pack('>I4sQ', 1, b'mdat', 16 + 100) + bytes(100)
+        moov = box(b'moov', mvhd(600, 600 * 30))
+        result = probe_mp4(io.BytesIO(large_mdat + moov))
+        self.assertEqual((result.duration_seconds, result.moov_offset), (30, 116))
+
+    def test_reads_only_box_headers(self):
+        file = io.BytesIO(mp4())
+        reads = []
+        original_read = file.read
+        file.read = lambda size=-1: reads.append(size) or original_read(size)
+        probe_mp4(file)
+        self.assertLess(sum(reads), 100)
+
+    def test_invalid_files(self):
+        for data in (b'', b'not a video at all', box(b'ftyp') + box(b'mdat', bytes(8)), box(b'moov', box(b'trak'))):
+            with self.subTest(data=data[:16]), self.assertRaises(ProbeError):
+                probe_mp4(io.BytesIO(data))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, BACKGROUND_TASKS_EAGER=True)
+class ProbeMovieTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def create(self, data, duration_minutes=0):
+        with self.captureOnCommitCallbacks(execute=True):
+            movie = Movie.objects.create(
+                title='Probe Test', release_year=2024, duration_minutes=duration_minutes,
+                video_file=SimpleUploadedFile('clip.mp4', data, content_type='video/mp4'),
+            )
+        movie.refresh_from_db()
+        return movie
+
+    def test_upload_fills_duration_and_moov_location(self):
+        data = mp4()
+        movie = self.create(data)
+        self.assertEqual(movie.duration_minutes, 90)
+        self.assertEqual((movie.moov_offset, movie.moov_size), (len(data) - movie.moov_size, movie.moov_size))
+
+    def test_entered_duration_is_kept(self):
+        movie = self.create(mp4(), duration_minutes=95)
+        self.assertEqual(movie.duration_minutes, 95)
+        self.assertIsNotNone(movie.moov_offset)
+
+    def test_unreadable_file_leaves_fields_empty(self):
+        movie = self.create(b'garbage' * 10, duration_minutes=10)
+        self.assertIsNone(movie.moov_offset)
+
+    def test_form_leaves_the_duration_to_the_probe(self):
+        category = Category.objects.create(name='Drama')
+        data = {'title': 'Form Test', 'release_year': 2024, 'category': category.pk}
+        video = SimpleUploadedFile('clip.mp4', mp4())
+        form = MovieForm(data, {'video_file': video})
+        with patch('project.media_probe.probe_mp4') as probe:
+            self.assertTrue(form.is_valid(), form.errors)
+        probe.assert_not_called()
+        self.assertEqual(form.cleaned_data['duration_minutes'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            movie = form.save()
+        movie.refresh_from_db()
+        self.assertEqual(movie.duration_minutes, 90)
+
+    def test_form_accepts_a_movie_without_video_or_duration(self):
+        category = Category.objects.create(name='Drama')
+        form = MovieForm({'title': 'Form Test', 'release_year': 2024, 'category': category.pk, 'duration_minutes': 0})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['duration_minutes'], 0)
+
+    def test_probe_runs_only_when_the_file_changes(self):
+        movie = self.create(b'garbage' * 10, duration_minutes=10)
+        with patch('project.media_probe.tasks.defer') as defer:
+            movie.title = 'Renamed'
+            movie.save()
+            Movie.objects.get(pk=movie.pk).save()
+        defer.assert_not_called()
+
+        with patch('project.media_probe.tasks.defer') as defer:
+            movie.video_file.name = 'movies/videos/other.mp4'
+            movie.save(update_fields=['video_file'])
+        defer.assert_called_once()
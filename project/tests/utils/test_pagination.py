@@ -0,0 +1,83 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase
+from project.models import Category
+from project.pagination import (
+    CachedCountPaginator, InvalidCursor, KeysetPaginator, encode_cursor, row_count_cache_key,
+)
+from project.templatetags.pagination_tags import page_window
+
+
+class CachedCountPaginatorTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        for i in range(25):
+            Category.objects.create(name=f"Category {i+1}")
+
+    def test_count_is_cached_between_requests(self):
+        self.assertEqual(CachedCountPaginator(Category.objects.order_by('id'), 10).count, 25)
+        with self.assertNumQueries(0):
+            paginator = CachedCountPaginator(Category.objects.order_by('id'), 10)
+            self.assertEqual(paginator.num_pages, 3)
+
+    def test_signals_keep_cached_count_current(self):
+        CachedCountPaginator(Category.objects.all(), 10).count
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Fresh')
+        self.assertEqual(cache.get(row_count_cache_key(Category)), 26)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.get(name='Fresh').delete()
+        self.assertEqual(cache.get(row_count_cache_key(Category)), 25)
+
+    def test_filtered_querysets_are_counted(self):
+        cache.set(row_count_cache_key(Category), 1000)
+        paginator = CachedCountPaginator(Category.objects.filter(name__startswith='Category 1'), 10)
+        self.assertEqual(paginator.count, 11)
+
+    def test_large_tables_use_estimate(self):
+        with patch('project.pagination.estimate_row_count', return_value=5_000_000):
+            paginator = CachedCountPaginator(Category.objects.all(), 10)
+            with self.assertNumQueries(0):
+                self.assertEqual(paginator.count, 5_000_000)
+
+
+class KeysetPaginatorTest(TestCase):
+
+    def setUp(self):
+        for i in range(5):
+            Category.objects.create(name=f"Category {i+1}")
+        self.paginator = KeysetPaginator(Category.objects.all(), 2)
+
+    def test_cursor_values_of_the_wrong_type_fall_back_to_the_first_page(self):
+        first = self.paginator.page(None)
+        for value in ('abc', None, {'a': 1}, [1]):
+            cursor = encode_cursor({'d': 'n', 'v': value})
+            with self.assertRaises(InvalidCursor):
+                self.paginator.page(cursor)
+            self.assertEqual(list(self.paginator.get_page(cursor)), list(first))
+
+
+class PageWindowTest(SimpleTestCase):
+
+    def test_window(self):
+        self.assertEqual(page_window(1, 1), [1])
+        self.assertEqual(page_window(1, 4), [1, 2, 3, 4])
+        self.assertEqual(page_window(4, 7), [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(page_window(5, 10), [1, None, 3, 4, 5, 6, 7, None, 10])
+        self.assertEqual(page_window(1, 10_000), [1, 2, 3, None, 10_000])
+        self.assertEqual(page_window(10_000, 10_000), [1, None, 9_998, 9_999, 10_000])
+
+    def test_rendering_does_not_walk_every_page(self):
+        page_obj = Paginator(range(1_000_000), 10).page(500)
+        html = Template('{% load pagination_tags %}{% render_pagination page_obj %}').render(
+            Context({'page_obj': page_obj}),
+        )
+        self.assertIn('?page=100000">100000<', html)
+        self.assertIn('?page=502">502<', html)
+        self.assertNotIn('?page=503"', html)
+        self.assertEqual(html.count('...'), 2)
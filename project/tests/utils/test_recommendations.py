@@ -0,0 +1,75 @@
+import io
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from project.models import Movie, MovieSimilarity, WatchHistory
+from project.recommendations import because_you_watched, compute_similarities, similar_movies
+
+
+class ComputeSimilaritiesTest(SimpleTestCase):
+
+    def test_matches_dense_cosine(self):
+        rng = np.random.default_rng(0)
+        matrix = np.where(rng.random((60, 12)) < 0.3, rng.random((60, 12)), 0.0)
+        users, items = np.nonzero(matrix)
+        movies, similar, scores = compute_similarities(
+            users, items + 100, matrix[users, items], top_k=3, pair_chunk=10,
+        )
+
+        norms = np.linalg.norm(matrix, axis=0)
+        cosine = (matrix.T @ matrix) / np.outer(norms, norms)
+        np.fill_diagonal(cosine, 0)
+        for item in range(12):
+            expected = np.sort(cosine[item][cosine[item] > 0])[::-1][:3]
+            np.testing.assert_allclose(scores[movies == item + 100], expected)
+            for other, score in zip(similar[movies == item + 100], scores[movies == item + 100]):
+                self.assertAlmostEqual(cosine[item, other - 100], score)
+
+    def test_per_user_cap_keeps_most_watched(self):
+        # With a cap of two, the user's lightly watched third movie is dropped.
+        movies, similar, _ = compute_similarities(
+            np.array([1, 1, 1]), np.array([10, 20, 30]), np.array([1.0, 0.9, 0.1]), max_items_per_user=2,
+        )
+        self.assertEqual(sorted(zip(movies.tolist(), similar.tolist())), [(10, 20), (20, 10)])
+
+    def test_no_history(self):
+        movies, _, _ = compute_similarities(np.array([]), np.array([]), np.array([]))
+        self.assertEqual(len(movies), 0)
+
+
+class RecommendationLookupTest(TestCase):
+
+    def setUp(self):
+        self.alien = Movie.objects.create(title='Alien', release_year=1979, duration_minutes=100)
+        self.aliens = Movie.objects.create(title='Aliens', release_year=1986, duration_minutes=100)
+        self.heat = Movie.objects.create(title='Heat', release_year=1995, duration_minutes=100)
+        self.ronin = Movie.objects.create(title='Ronin', release_year=1998, duration_minutes=100)
+        for name, watched in [
+            ('ann', {self.alien: 100, self.aliens: 90}),
+            ('bob', {self.alien: 80, self.aliens: 100, self.heat: 10}),
+            ('cat', {self.heat: 100, self.ronin: 100}),
+        ]:
+            user = User.objects.create_user(username=name)
+            for movie, minutes in watched.items():
+                WatchHistory.objects.create(user=user, movie=movie, watched_minutes=minutes)
+        call_command('build_recommendations', stdout=io.StringIO())
+
+    def test_neighbours_are_ranked_by_score(self):
+        with self.assertNumQueries(1):
+            neighbours = similar_movies(self.alien)
+        self.assertEqual(neighbours, [self.aliens, self.heat])
+
+    def test_rebuild_replaces_previous_rows(self):
+        count = MovieSimilarity.objects.count()
+        call_command('build_recommendations', stdout=io.StringIO())
+        self.assertEqual(MovieSimilarity.objects.count(), count)
+
+    def test_because_you_watched_skips_seen_movies(self):
+        user = User.objects.create_user(username='dan')
+        WatchHistory.objects.create(user=user, movie=self.heat, watched_minutes=50)
+        WatchHistory.objects.create(user=user, movie=self.alien, watched_minutes=60)
+        watched, movies = because_you_watched(user)
+        self.assertEqual(watched, self.alien)
+        self.assertEqual(movies, [self.aliens])
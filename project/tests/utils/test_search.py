@@ -0,0 +1,52 @@
+from django.test import TestCase
+from project.models import Category, Movie
+from project.search import build_match_query, search_movies
+
+
+class MovieSearchTest(TestCase):
+
+    def setUp(self):
+        self.scifi = Category.objects.create(name='Sci-Fi')
+        self.drama = Category.objects.create(name='Drama')
+        self.star_wars = Movie.objects.create(
+            title='Star Wars', category=self.scifi, release_year=1977, duration_minutes=121,
+            description='A farm boy joins a rebellion.',
+        )
+        self.stardust = Movie.objects.create(
+            title='Stardust', category=self.drama, release_year=2007, duration_minutes=127,
+            description='A young man crosses a wall into a magical land.',
+        )
+        self.documentary = Movie.objects.create(
+            title='Cosmos', category=self.scifi, release_year=1980, duration_minutes=60,
+            description='A documentary about the stars and the universe.',
+        )
+
+    def test_build_match_query_uses_prefix_terms(self):
+        self.assertEqual(build_match_query('star wa'), '"star"* "wa"*')
+        self.assertEqual(build_match_query('"; DROP TABLE'), '"DROP"* "TABLE"*')
+        self.assertEqual(build_match_query('  '), '')
+
+    def test_prefix_search_ranks_title_matches_first(self):
+        results = search_movies('star')
+        self.assertEqual(set(results), {self.star_wars, self.stardust, self.documentary})
+        self.assertEqual(results[-1], self.documentary)
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(search_movies('star war'), [self.star_wars])
+
+    def test_search_combined_with_category(self):
+        self.assertEqual(search_movies('star', category=self.drama), [self.stardust])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.stardust.title = 'Moonlight'
+        self.stardust.save()
+        self.assertEqual(search_movies('moon'), [self.stardust])
+        self.assertNotIn(self.stardust, search_movies('stardust'))
+
+        self.star_wars.delete()
+        self.assertEqual(search_movies('wars'), [])
+
+    def test_search_runs_in_two_queries(self):
+        with self.assertNumQueries(2):
+            results = search_movies('star')
+            [movie.category.name for movie in results]
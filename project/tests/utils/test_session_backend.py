@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from project.session_backend import SessionStore
+
+
+class SessionStoreTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        session = SessionStore()
+        session['theme'] = 'dark'
+        session.create()
+        self.key = session.session_key
+
+    def test_reads_come_from_the_cache(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(self.key)['theme'], 'dark')
+
+    def test_unchanged_save_is_skipped(self):
+        session = SessionStore(self.key)
+        session['theme'] = 'dark'
+        session.modified = True
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_changed_save_is_written(self):
+        session = SessionStore(self.key)
+        session['theme'] = 'light'
+        session.save()
+        cache.clear()
+        self.assertEqual(SessionStore(self.key)['theme'], 'light')
+
+    def test_expiry_is_refreshed_once_per_interval(self):
+        stale = timezone.now() + timedelta(minutes=5)
+        Session.objects.filter(pk=self.key).update(expire_date=stale)
+        cache.delete(f'{SessionStore(self.key).cache_key}:written')
+
+        session = SessionStore(self.key)
+        session['theme']
+        session.save()
+        self.assertGreater(Session.objects.get(pk=self.key).expire_date, stale)
+
+        # The next unchanged save within the interval is coalesced away.
+        session = SessionStore(self.key)
+        session['theme']
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_flush_ends_the_session_for_every_reader(self):
+        SessionStore(self.key).flush()
+        self.assertEqual(SessionStore(self.key).load(), {})
+        self.assertFalse(Session.objects.filter(pk=self.key).exists())
+
+    def test_new_session_without_key_is_created(self):
+        session = SessionStore()
+        session['theme'] = 'dark'
+        session.save()
+        self.assertTrue(Session.objects.filter(pk=session.session_key).exists())
+
+
+class SessionMiddlewareTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='viewer', password='viewerpass')
+        self.client.force_login(self.user)
+
+    @override_settings(SESSION_SAVE_EVERY_REQUEST=True)
+    def test_repeat_requests_do_not_write_the_session(self):
+        url = reverse('website:continue-watching-view')
+        self.client.get(url)
+        with self.assertNumQueries(2):
+            # The user and the page's own query; the session is neither read nor written.
+            self.client.get(url)
@@ -0,0 +1,54 @@
+from django.test import TestCase
+from project.models import Category, Movie
+from project.slugs import PREFIX_QUERY_CHUNK, allocate_slugs
+
+
+class AllocateSlugsTest(TestCase):
+
+    def movie(self, title, **kwargs):
+        return Movie(title=title, release_year=2000, duration_minutes=90, **kwargs)
+
+    def test_single_saves_with_same_title(self):
+        first = Movie.objects.create(title='Heat', release_year=1995, duration_minutes=170)
+        second = Movie.objects.create(title='Heat', release_year=1986, duration_minutes=100)
+        self.assertEqual((first.slug, second.slug), ('heat', 'heat-2'))
+
+    def test_batch_resolves_collisions_in_one_query(self):
+        Movie.objects.create(title='Heat', release_year=1995, duration_minutes=170)
+        Movie.objects.create(title='Heat wave', release_year=1995, duration_minutes=90)
+        movies = [self.movie('Heat'), self.movie('HEAT'), self.movie('Alien'), self.movie('Alien')]
+        with self.assertNumQueries(1) as queries:
+            allocate_slugs(Movie, movies, 'title')
+        self.assertEqual([movie.slug for movie in movies], ['heat-2', 'heat-3', 'alien', 'alien-2'])
+        # Range predicates seek the slug index; LIKE would scan it.
+        self.assertNotIn('LIKE', queries.captured_queries[0]['sql'])
+
+    def test_prefix_range_excludes_neighbours(self):
+        for title in ('Heat', 'Heat 2', 'Heata', 'Heau'):
+            Movie.objects.create(title=title, release_year=1995, duration_minutes=90)
+        movie = self.movie('Heat')
+        allocate_slugs(Movie, [movie], 'title')
+        self.assertEqual(movie.slug, 'heat-3')
+
+    def test_existing_slugs_in_batch_are_kept_and_reserved(self):
+        movies = [self.movie('Heat', slug='heat'), self.movie('Heat')]
+        allocate_slugs(Movie, movies, 'title')
+        self.assertEqual([movie.slug for movie in movies], ['heat', 'heat-2'])
+
+    def test_long_names_are_truncated_to_fit_suffix(self):
+        name = 'x' * 150
+        first = Category.objects.create(name=name)
+        second = Category.objects.create(name=name.upper())
+        self.assertEqual(len(first.slug), 120)
+        self.assertEqual(second.slug, 'x' * 118 + '-2')
+
+    def test_unsluggable_names_fall_back_to_model_name(self):
+        category = Category.objects.create(name='!!!')
+        self.assertEqual(category.slug, 'category')
+
+    def test_large_batches_are_chunked(self):
+        movies = [self.movie(f'Movie {i}') for i in range(PREFIX_QUERY_CHUNK + 1)]
+        with self.assertNumQueries(2):
+            allocate_slugs(Movie, movies, 'title')
+        Movie.objects.bulk_create(movies)
+        self.assertEqual(Movie.objects.values('slug').distinct().count(), PREFIX_QUERY_CHUNK + 1)
@@ -0,0 +1,92 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.client import RequestFactory
+from project.staticfiles import PrecompressedStaticMiddleware, accepted_encodings
+
+SOURCE_DIR = tempfile.mkdtemp()
+STATIC_ROOT = tempfile.mkdtemp()
+CSS = 'body { color: #333; }\n' * 100
+
+
+class AcceptedEncodingsTest(SimpleTestCase):
+
+    def test_parses_qualities(self):
+        self.assertEqual(accepted_encodings('gzip, deflate, br;q=0'), {'gzip', 'deflate'})
+        self.assertEqual(accepted_encodings('br;q=0.8, GZIP;q=0.5'), {'br', 'gzip'})
+        self.assertEqual(accepted_encodings(''), set())
+
+
+@override_settings(STATICFILES_DIRS=[SOURCE_DIR], STATIC_ROOT=STATIC_ROOT)
+class PrecompressedStaticTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(SOURCE_DIR, 'css'), exist_ok=True)
+        with open(os.path.join(SOURCE_DIR, 'css', 'site.css'), 'w') as file:
+            file.write(CSS)
+        with open(os.path.join(SOURCE_DIR, 'tiny.txt'), 'w') as file:
+            file.write('hi')
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.hashed = staticfiles_storage.stored_name('css/site.css')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(SOURCE_DIR, ignore_errors=True)
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.middleware = PrecompressedStaticMiddleware(lambda request: 'next')
+        self.factory = RequestFactory()
+
+    def get(self, path, **headers):
+        return self.middleware(self.factory.get('/static/' + path, headers=headers))
+
+    def test_collectstatic_hashes_and_compresses(self):
+        self.assertRegex(self.hashed, r'^css/site\.[0-9a-f]{12}\.css$')
+        with gzip.open(os.path.join(STATIC_ROOT, self.hashed + '.gz'), 'rt') as file:
+            self.assertEqual(file.read(), CSS)
+        # Too small to be worth compressing.
+        self.assertFalse(os.path.exists(os.path.join(STATIC_ROOT, 'tiny.txt.gz')))
+
+    def test_hashed_name_is_immutable_and_gzipped(self):
+        response = self.get(self.hashed, accept_encoding='gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)).decode(), CSS)
+
+    def test_identity_when_gzip_not_accepted(self):
+        response = self.get(self.hashed)
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(int(response['Content-Length']), len(CSS))
+
+    def test_unhashed_name_gets_short_cache(self):
+        response = self.get('css/site.css')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+
+    def test_conditional_request(self):
+        etag = self.get(self.hashed, accept_encoding='gzip')['ETag']
+        response = self.get(self.hashed, accept_encoding='gzip', if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        # The identity representation has its own ETag.
+        self.assertEqual(self.get(self.hashed, if_none_match=etag).status_code, 200)
+
+    def test_unknown_paths_fall_through(self):
+        self.assertEqual(self.get('missing.css'), 'next')
+        self.assertEqual(self.middleware(self.factory.get('/movies')), 'next')
+        self.assertEqual(self.middleware(self.factory.post('/static/' + self.hashed)), 'next')
+
+
+class StaticTagWithoutManifestTest(SimpleTestCase):
+
+    def test_falls_back_to_unhashed_name(self):
+        self.assertEqual(staticfiles_storage.url('css/bootstrap.min.css'), '/static/css/bootstrap.min.css')
@@ -0,0 +1,77 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from project.models import Category, Movie, UserCategoryStats, UserViewingStats, WatchHistory
+from project.progress import ProgressBuffer
+
+
+class ViewingStatsTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewer')
+        self.drama = Category.objects.create(name='Drama')
+        self.heat = Movie.objects.create(title='Heat', category=self.drama, release_year=1995, duration_minutes=100)
+        self.alien = Movie.objects.create(title='Alien', release_year=1979, duration_minutes=50)
+
+    def stats(self):
+        stats = UserViewingStats.objects.get(user=self.user)
+        return stats.minutes_watched, stats.titles_completed
+
+    def category_stats(self):
+        stats = UserCategoryStats.objects.get(user=self.user, category=self.drama)
+        return stats.minutes_watched, stats.titles_completed
+
+    def test_saves_apply_deltas(self):
+        history = WatchHistory.objects.create(user=self.user, movie=self.heat, watched_minutes=40)
+        self.assertEqual(self.stats(), (40, 0))
+        history.watched_minutes = 100
+        history.save()
+        self.assertEqual(self.stats(), (100, 1))
+        self.assertEqual(self.category_stats(), (100, 1))
+
+        reloaded = WatchHistory.objects.get(pk=history.pk)
+        reloaded.watched_minutes = 70
+        reloaded.save()
+        self.assertEqual(self.stats(), (70, 0))
+
+    def test_uncategorized_movies_only_count_in_totals(self):
+        WatchHistory.objects.create(user=self.user, movie=self.alien, watched_minutes=50)
+        self.assertEqual(self.stats(), (50, 1))
+        self.assertFalse(UserCategoryStats.objects.exists())
+
+    def test_delete_subtracts(self):
+        WatchHistory.objects.create(user=self.user, movie=self.heat, watched_minutes=30)
+        WatchHistory.objects.create(user=self.user, movie=self.alien, watched_minutes=50)
+        WatchHistory.objects.get(movie=self.alien).delete()
+        self.assertEqual(self.stats(), (30, 0))
+
+    def test_deleting_user_cascades_cleanly(self):
+        WatchHistory.objects.create(user=self.user, movie=self.heat, watched_minutes=30)
+        self.user.delete()
+        self.assertFalse(UserViewingStats.objects.exists())
+
+    def test_buffer_flush_feeds_stats_in_bulk(self):
+        WatchHistory.objects.create(user=self.user, movie=self.heat, watched_minutes=30)
+        other = User.objects.create_user(username='other')
+        buffer = ProgressBuffer(flush_interval=3600, flush_size=100)
+        buffer.add(self.user.pk, self.heat.pk, 100)
+        buffer.add(self.user.pk, self.alien.pk, 10)
+        buffer.add(other.pk, self.heat.pk, 20)
+        # movies, previous rows, upsert, one insert and one update per stats
+        # table, and two savepoints (opened and released)
+        with self.assertNumQueries(11):
+            buffer.flush()
+        self.assertEqual(self.stats(), (110, 1))
+        self.assertEqual(self.category_stats(), (100, 1))
+        self.assertEqual(UserViewingStats.objects.get(user=other).minutes_watched, 20)
+
+    def test_rebuild_fixes_drift(self):
+        WatchHistory.objects.create(user=self.user, movie=self.heat, watched_minutes=100)
+        WatchHistory.objects.create(user=self.user, movie=self.alien, watched_minutes=20)
+        # queryset.update() bypasses the incremental path.
+        WatchHistory.objects.filter(movie=self.alien).update(watched_minutes=50)
+        call_command('rebuild_viewing_stats', stdout=io.StringIO())
+        self.assertEqual(self.stats(), (150, 2))
+        self.assertEqual(self.category_stats(), (100, 1))
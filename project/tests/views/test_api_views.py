@@ -0,0 +1,192 @@
+import time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from project.models import Category, Movie, WatchHistory
+from project.pagination import row_count_cache_key
+from project.progress import progress_buffer
+
+
+class MovieApiViewTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.drama = Category.objects.create(name='Drama')
+        self.comedy = Category.objects.create(name='Comedy')
+        for i in range(30):
+            Movie.objects.create(
+                title=f'Movie {i}', release_year=2000, duration_minutes=100,
+                category=self.drama if i % 3 else self.comedy,
+            )
+        self.user = User.objects.create_user(username='viewer', password='viewerpass')
+        self.list_url = reverse('website:api-movie-list-view')
+
+    async def test_lists_newest_first_in_pages(self):
+        response = await self.async_client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['count'], 30)
+        self.assertTrue(data['has_next'])
+        self.assertEqual(len(data['results']), 24)
+        self.assertEqual(data['results'][0]['title'], 'Movie 29')
+
+        data = (await self.async_client.get(self.list_url, {'page': 2})).json()
+        self.assertEqual([movie['title'] for movie in data['results']][-1], 'Movie 0')
+        self.assertFalse(data['has_next'])
+
+    async def test_unfiltered_count_comes_from_the_shared_cache(self):
+        await cache.aset(row_count_cache_key(Movie), 1234)
+        data = (await self.async_client.get(self.list_url)).json()
+        self.assertEqual(data['count'], 1234)
+
+    async def test_filters_by_category(self):
+        data = (await self.async_client.get(self.list_url, {'category': self.comedy.pk})).json()
+        self.assertEqual(data['count'], 10)
+        self.assertEqual({movie['category']['name'] for movie in data['results']}, {'Comedy'})
+
+        data = (await self.async_client.get(self.list_url, {'category': 'comedy'})).json()
+        self.assertEqual(data['count'], 10)
+        response = await self.async_client.get(self.list_url, {'category': 'western'})
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.get(self.list_url, {'category': '99999999999999999999999'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_rejects_non_integer_page(self):
+        response = await self.async_client.get(self.list_url, {'page': 'two'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_page_past_the_end_is_empty(self):
+        data = (await self.async_client.get(self.list_url, {'page': '99999999999999999999'})).json()
+        self.assertEqual(data['results'], [])
+        self.assertFalse(data['has_next'])
+
+    async def test_sparse_fieldsets(self):
+        data = (await self.async_client.get(self.list_url, {'fields': 'title,id'})).json()
+        self.assertEqual(data['results'][0], {'id': data['results'][0]['id'], 'title': 'Movie 29'})
+
+        response = await self.async_client.get(self.list_url, {'fields': 'title,budget'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('budget', response.json()['errors']['fields'][0])
+
+    def test_matching_etag_is_answered_without_queries(self):
+        response = self.client.get(self.list_url)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        # Other query strings are other representations.
+        response = self.client.get(self.list_url, {'page': 2}, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_deletes_move_last_modified_forward(self):
+        response = self.client.get(self.list_url)
+        last_modified = response['Last-Modified']
+        response = self.client.get(self.list_url, headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 304)
+
+        with patch('project.catalogue.time.time', return_value=time.time() + 5), \
+                self.captureOnCommitCallbacks(execute=True):
+            Movie.objects.order_by('-created_at').first().delete()
+        response = self.client.get(self.list_url, headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 29)
+
+    async def test_edits_change_the_etag(self):
+        etag = (await self.async_client.get(self.list_url))['ETag']
+        movie = await Movie.objects.aget(title='Movie 3')
+        movie.title = 'Renamed'
+        await movie.asave()
+        response = await self.async_client.get(self.list_url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # Movies embed their category, so category edits count too.
+        etag = response['ETag']
+        self.comedy.name = 'Stand-up'
+        await self.comedy.asave()
+        response = await self.async_client.get(self.list_url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_categories(self):
+        url = reverse('website:api-category-list-view')
+        response = self.client.get(url, {'fields': 'name'})
+        self.assertEqual(response.json(), {'results': [{'name': 'Comedy'}, {'name': 'Drama'}]})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'fields': 'name'}, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_detail_includes_the_users_progress(self):
+        movie = await Movie.objects.aget(title='Movie 5')
+        await WatchHistory.objects.acreate(user=self.user, movie=movie, watched_minutes=40)
+        url = reverse('website:api-movie-detail-view', kwargs={'slug': movie.slug})
+
+        data = (await self.async_client.get(url)).json()
+        self.assertEqual(data['title'], 'Movie 5')
+        self.assertNotIn('watched_minutes', data)
+
+        data = (await self.async_client.get(url, {'fields': 'slug'})).json()
+        self.assertEqual(data, {'slug': movie.slug})
+
+        await self.async_client.aforce_login(self.user)
+        data = (await self.async_client.get(url)).json()
+        self.assertEqual(data['watched_minutes'], 40)
+
+    async def test_detail_unknown_slug_is_404(self):
+        response = await self.async_client.get(reverse('website:api-movie-detail-view', kwargs={'slug': 'nope'}))
+        self.assertEqual(response.status_code, 404)
+
+
+class WatchProgressApiViewTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        progress_buffer.clear()
+        self.user = User.objects.create_user(username='viewer', password='viewerpass')
+        self.movie = Movie.objects.create(title='Heartbeat', release_year=2024, duration_minutes=120)
+        self.url = reverse('website:api-watch-progress-view', kwargs={'pk': self.movie.pk})
+
+        patcher = patch.multiple(progress_buffer, flush_interval=3600, flush_size=1000)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_anonymous_gets_401(self):
+        response = await self.async_client.post(self.url, {'watched_minutes': 5})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(len(progress_buffer), 0)
+
+    async def test_heartbeat_is_buffered(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(self.url, {'watched_minutes': 5})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(progress_buffer._pending, {(self.user.pk, self.movie.pk)})
+
+    async def test_due_flush_writes_the_buffer(self):
+        await self.async_client.aforce_login(self.user)
+        with patch.object(progress_buffer, 'flush_size', 1):
+            response = await self.async_client.post(self.url, {'watched_minutes': 7})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(len(progress_buffer), 0)
+        history = await WatchHistory.objects.aget(user=self.user, movie=self.movie)
+        self.assertEqual(history.watched_minutes, 7)
+
+    async def test_unknown_movie_is_404(self):
+        await self.async_client.aforce_login(self.user)
+        url = reverse('website:api-watch-progress-view', kwargs={'pk': 99999999999999999999999})
+        response = await self.async_client.post(url, {'watched_minutes': 5})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(len(progress_buffer), 0)
+
+    async def test_invalid_minutes_are_rejected(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(self.url, {'watched_minutes': 'soon'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('watched_minutes', response.json()['errors'])
@@ -0,0 +1,68 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from project.models import Category, Movie
+
+
+class CatalogueImportViewTest(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='AdminPass123!')
+        self.client.force_login(self.admin)
+
+    def test_import_categories_from_csv(self):
+        upload = SimpleUploadedFile('categories.csv', b'name\nAction\nComedy\n')
+        response = self.client.post(reverse('website:import-category-view'), {'file': upload})
+        self.assertRedirects(response, reverse('website:category-view'))
+        self.assertCountEqual(Category.objects.values_list('slug', flat=True), ['action', 'comedy'])
+
+    def test_import_movies_from_jsonl(self):
+        Category.objects.create(name='Sci-Fi')
+        lines = [
+            {'title': 'Alien', 'category': 'sci-fi', 'release_year': 1979, 'duration_minutes': 117},
+            {'title': 'Heat', 'release_year': 1995, 'duration_minutes': 170},
+        ]
+        upload = SimpleUploadedFile('movies.jsonl', '\n'.join(json.dumps(line) for line in lines).encode())
+        response = self.client.post(reverse('website:import-movie-view'), {'file': upload})
+        self.assertRedirects(response, reverse('website:movie-list-view'))
+        self.assertEqual(Movie.objects.get(slug='alien').category.name, 'Sci-Fi')
+        self.assertIsNone(Movie.objects.get(slug='heat').category)
+
+    def test_invalid_row_imports_nothing(self):
+        upload = SimpleUploadedFile('movies.csv', b'title,release_year,duration_minutes\nAlien,1979,117\nBroken,1990,0\n')
+        response = self.client.post(reverse('website:import-movie-view'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['errors'][0][0], 3)
+        self.assertFalse(Movie.objects.exists())
+
+    def test_import_requires_superuser(self):
+        User.objects.create_user(username='viewer', password='ViewerPass123!')
+        self.client.login(username='viewer', password='ViewerPass123!')
+        response = self.client.get(reverse('website:import-category-view'))
+        self.assertEqual(response.status_code, 302)
+
+
+class CatalogueExportViewTest(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='AdminPass123!')
+        self.client.force_login(self.admin)
+        drama = Category.objects.create(name='Drama')
+        Movie.objects.create(title='Heat', category=drama, release_year=1995, duration_minutes=170)
+
+    def test_export_categories_as_csv(self):
+        response = self.client.get(reverse('website:export-category-view'))
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content).decode(), 'name,slug\r\nDrama,drama\r\n')
+
+    def test_export_movies_as_jsonl(self):
+        response = self.client.get(reverse('website:export-movie-view'), {'format': 'jsonl'})
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="movies.jsonl"')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(rows, [{
+            'title': 'Heat', 'slug': 'heat', 'category': 'Drama', 'description': '',
+            'release_year': 1995, 'duration_minutes': 170,
+        }])
@@ -3,12 +3,16 @@ from django.urls import reverse
 from django.conf import settings
 from django.contrib.messages import get_messages
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from project.models import Category
 from project.collectForms.categories_forms import CategoryForm
 
 class CategoryViewPermissionTest(TestCase):
 
     def setUp(self):
+        # Row counts are cached across requests
+        cache.clear()
+
         # Create superuser
         self.superuser = User.objects.create_superuser(
             username='admin',
@@ -305,3 +309,59 @@ class DeleteCategoryViewTest(TestCase):
         # Restore original method
         Category.objects.get = original_get
 
+
+
+class CategoryKeysetPaginationTest(TestCase):
+
+    def setUp(self):
+        self.superuser = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass'
+        )
+        for i in range(25):
+            Category.objects.create(name=f"Category {i+1}")
+        self.url = reverse('website:category-view')
+        self.client.login(username='admin', password='adminpass')
+
+    def test_first_page_in_cursor_mode(self):
+        response = self.client.get(self.url, {'cursor': ''})
+        self.assertEqual(response.status_code, 200)
+
+        page_obj = response.context['category_objects']
+        self.assertTrue(page_obj.is_keyset)
+        self.assertEqual(len(page_obj.object_list), 10)
+        self.assertFalse(page_obj.has_previous())
+        self.assertTrue(page_obj.has_next())
+        self.assertEqual(page_obj.start_index(), 1)
+        self.assertContains(response, f'?cursor={page_obj.next_cursor}')
+
+    def test_follow_next_and_previous_cursors(self):
+        first = self.client.get(self.url, {'cursor': ''}).context['category_objects']
+        second = self.client.get(self.url, {'cursor': first.next_cursor}).context['category_objects']
+        third = self.client.get(self.url, {'cursor': second.next_cursor}).context['category_objects']
+
+        self.assertEqual(second.start_index(), 11)
+        self.assertEqual(len(third.object_list), 5)
+        self.assertFalse(third.has_next())
+        self.assertGreater(second.object_list[0].id, first.object_list[-1].id)
+
+        back = self.client.get(self.url, {'cursor': second.previous_cursor}).context['category_objects']
+        self.assertEqual([c.id for c in back], [c.id for c in first])
+        self.assertFalse(back.has_previous())
+
+    def test_cursor_page_skips_count_and_offset(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        first = self.client.get(self.url, {'cursor': ''}).context['category_objects']
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url, {'cursor': first.next_cursor})
+        category_sql = [q['sql'] for q in ctx.captured_queries if 'project_category' in q['sql']]
+        self.assertEqual(len(category_sql), 1)
+        self.assertNotIn('COUNT(', category_sql[0])
+        self.assertNotIn('OFFSET', category_sql[0])
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        page_obj = response.context['category_objects']
+        self.assertEqual(page_obj.start_index(), 1)
+        self.assertFalse(page_obj.has_previous())
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from project.models import Movie, WatchHistory
+
+
+class ContinueWatchingViewTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewer', password='ViewerPass123!')
+        self.url = reverse('website:continue-watching-view')
+        now = timezone.now()
+        for i in range(6):
+            movie = Movie.objects.create(title=f'Movie {i}', release_year=2000, duration_minutes=100)
+            history = WatchHistory.objects.create(user=self.user, movie=movie, watched_minutes=i * 20)
+            # auto_now can't be overridden through save().
+            WatchHistory.objects.filter(pk=history.pk).update(last_watched_at=now - timedelta(hours=i))
+
+    def test_requires_login(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_lists_unfinished_titles_newest_first(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        entries = list(response.context['continue_watching'])
+        # 0 minutes is not started, 100 of 100 is finished.
+        self.assertEqual([entry.movie.title for entry in entries], ['Movie 1', 'Movie 2', 'Movie 3', 'Movie 4'])
+        self.assertEqual([entry.progress_percentage for entry in entries], [20.0, 40.0, 60.0, 80.0])
+
+    def test_renders_in_one_query(self):
+        entries = WatchHistory.objects.continue_watching(self.user)
+        with self.assertNumQueries(1):
+            for entry in entries:
+                entry.progress_percentage, entry.movie.title, entry.movie.category
+
+    def test_home_page_shows_the_rail(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('website:index-view'))
+        self.assertContains(response, 'Continue watching')
+        self.assertContains(response, 'width: 20.00%')
+
+
+class ViewingStatsViewTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewer')
+        movie = Movie.objects.create(title='Heat', release_year=1995, duration_minutes=100)
+        WatchHistory.objects.create(user=self.user, movie=movie, watched_minutes=100)
+        self.url = reverse('website:viewing-stats-view')
+
+    def test_shows_precomputed_totals(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['stats'].minutes_watched, 100)
+        self.assertEqual(response.context['stats'].titles_completed, 1)
+
+    def test_user_without_history_sees_zeros(self):
+        self.client.force_login(User.objects.create_user(username='new'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['stats'].minutes_watched, 0)
@@ -0,0 +1,86 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from project.models import Category, Movie, WatchHistory
+
+
+class IndexRailsViewTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.action = Category.objects.create(name='Action')
+        self.drama = Category.objects.create(name='Drama')
+        for i in range(10):
+            Movie.objects.create(title=f'Action {i}', category=self.action, release_year=2020, duration_minutes=90)
+        Movie.objects.create(title='Quiet Drama', category=self.drama, release_year=2021, duration_minutes=100)
+        self.url = reverse('website:index-view')
+
+    def test_rails_are_grouped_and_limited(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Quiet Drama')
+        self.assertContains(response, 'Action 9')
+        # Only the newest eight per rail
+        self.assertNotContains(response, 'Action 1<')
+
+    def test_query_counts(self):
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+        # Every fragment is cached and the categories are held in memory.
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_movie_change_invalidates_its_rail(self):
+        self.client.get(self.url)
+        movie = Movie.objects.get(title='Quiet Drama')
+        movie.title = 'Loud Drama'
+        movie.save()
+
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Loud Drama')
+        self.assertNotContains(response, 'Quiet Drama')
+
+    def test_moving_movie_updates_both_rails(self):
+        self.client.get(self.url)
+        movie = Movie.objects.get(title='Quiet Drama')
+        movie.category = self.action
+        movie.save()
+        Movie.objects.create(title='Second Drama', category=self.drama, release_year=2022, duration_minutes=80)
+
+        response = self.client.get(self.url)
+        content = response.content.decode()
+        self.assertLess(content.index('Quiet Drama'), content.index('>Drama<'))
+
+    def test_empty_catalogue(self):
+        Movie.objects.all().delete()
+        Category.objects.all().delete()
+        response = self.client.get(self.url)
+        self.assertContains(response, 'No movies yet.')
+
+
+class IndexRecommendationsViewTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        alien = Movie.objects.create(title='Alien', release_year=1979, duration_minutes=100)
+        aliens = Movie.objects.create(title='Aliens', release_year=1986, duration_minutes=100)
+        self.fan = User.objects.create_user(username='fan')
+        other = User.objects.create_user(username='other')
+        WatchHistory.objects.create(user=self.fan, movie=alien, watched_minutes=90)
+        WatchHistory.objects.create(user=other, movie=alien, watched_minutes=100)
+        WatchHistory.objects.create(user=other, movie=aliens, watched_minutes=100)
+        call_command('build_recommendations', stdout=io.StringIO())
+
+    def test_signed_in_user_sees_because_you_watched(self):
+        self.client.force_login(self.fan)
+        response = self.client.get(reverse('website:index-view'))
+        self.assertContains(response, 'Because you watched Alien')
+        self.assertEqual(response.context['recommended'], [Movie.objects.get(title='Aliens')])
+
+    def test_anonymous_user_gets_no_recommendations(self):
+        response = self.client.get(reverse('website:index-view'))
+        self.assertNotContains(response, 'Because you watched')
@@ -1,12 +1,18 @@
-from django.test import TestCase
+from unittest.mock import patch
+
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.contrib.messages import get_messages
 import django.contrib.auth
+from project.throttling import client_ip, throttle_counters
 
 class LoginViewPostTest(TestCase):
 
     def setUp(self):
+        # Login throttle buckets live in the cache
+        cache.clear()
         self.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
@@ -37,7 +43,6 @@ class LoginViewPostTest(TestCase):
         self.assertRedirects(response, reverse('website:login-view-get'))
 
     def test_exception_handling_shows_server_error(self):
-        from unittest.mock import patch
         """Simulate exception during authenticate and show server error."""
         with patch('project.views.authenticate', side_effect=Exception("Test exception")):
             data = {'username': 'testuser', 'password': 'StrongPass123'}
@@ -70,3 +75,57 @@ class LoginViewPostTest(TestCase):
         )
 
 
+@override_settings(LOGIN_THROTTLE_IP_RATE=(3, 0.001), LOGIN_THROTTLE_IDENTIFIER_RATE=(2, 0.001))
+class LoginThrottleTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='StrongPass123')
+        self.url = reverse('website:login-view-post')
+
+    def test_identifier_bucket_rejects_before_hashing(self):
+        for _ in range(2):
+            self.client.post(self.url, {'username': 'testuser', 'password': 'wrong'})
+
+        with patch('django.contrib.auth.hashers.pbkdf2') as pbkdf2:
+            response = self.client.post(self.url, {'username': 'testuser', 'password': 'StrongPass123'}, follow=True)
+        pbkdf2.assert_not_called()
+        self.assertFalse(response.context['user'].is_authenticated)
+        messages = list(get_messages(response.wsgi_request))
+        self.assertTrue(any('Too many login attempts' in str(m) for m in messages))
+
+    def test_ip_bucket_covers_all_identifiers(self):
+        for name in ('a', 'b', 'c'):
+            self.client.post(self.url, {'username': name, 'password': 'wrong'})
+        response = self.client.post(self.url, {'username': 'testuser', 'password': 'StrongPass123'}, follow=True)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_counters_are_recorded(self):
+        for _ in range(3):
+            self.client.post(self.url, {'username': 'testuser', 'password': 'wrong'})
+        self.assertEqual(throttle_counters(), {'allowed': 2, 'rejected_ip': 0, 'rejected_identifier': 1})
+
+    @override_settings(LOGIN_THROTTLE_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_forwarded_ip_is_the_one_the_proxy_added(self):
+        request = RequestFactory().post(self.url, HTTP_X_FORWARDED_FOR='10.0.0.1, 203.0.113.7')
+        self.assertEqual(client_ip(request), '203.0.113.7')
+
+        # A spoofed left-most entry doesn't buy a fresh bucket.
+        for spoofed in ('1.1.1.1', '2.2.2.2', '3.3.3.3'):
+            self.client.post(self.url, {'username': spoofed, 'password': 'wrong'},
+                             HTTP_X_FORWARDED_FOR=f'{spoofed}, 203.0.113.7')
+        response = self.client.post(self.url, {'username': 'testuser', 'password': 'StrongPass123'},
+                                    HTTP_X_FORWARDED_FOR='4.4.4.4, 203.0.113.7', follow=True)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    @override_settings(LOGIN_THROTTLE_IP_HEADER='HTTP_X_FORWARDED_FOR', LOGIN_THROTTLE_PROXY_COUNT=2)
+    def test_proxy_count_skips_trusted_hops(self):
+        request = RequestFactory().post(self.url, HTTP_X_FORWARDED_FOR='1.1.1.1, 203.0.113.7, 10.0.0.2')
+        self.assertEqual(client_ip(request), '203.0.113.7')
+
+    @override_settings(LOGIN_THROTTLE_ENABLED=False)
+    def test_throttle_can_be_disabled(self):
+        for _ in range(3):
+            self.client.post(self.url, {'username': 'testuser', 'password': 'wrong'})
+        response = self.client.post(self.url, {'username': 'testuser', 'password': 'StrongPass123'}, follow=True)
+        self.assertTrue(response.context['user'].is_authenticated)
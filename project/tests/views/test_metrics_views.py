@@ -0,0 +1,72 @@
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from project.metrics import RequestMetricsMiddleware, registry
+from project.models import Category
+
+
+class MetricsViewTest(TestCase):
+
+    def setUp(self):
+        registry.reset()
+        self.superuser = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass'
+        )
+        User.objects.create_user(username='user', password='userpass')
+        self.url = reverse('website:metrics-view')
+
+    def test_superuser_sees_prometheus_text(self):
+        self.client.login(username='admin', password='adminpass')
+        self.client.get(reverse('website:category-view'))
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE movies_request_duration_seconds histogram', body)
+        self.assertIn('movies_request_duration_seconds_count{view="website:category-view"} 1', body)
+        self.assertIn('movies_request_queries_bucket{view="website:category-view",le="+Inf"} 1', body)
+        self.assertIn('movies_login_throttle_total{result="allowed"}', body)
+
+    def test_regular_user_cannot_read_metrics(self):
+        self.client.login(username='user', password='userpass')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+
+    def setUp(self):
+        registry.reset()
+        for i in range(6):
+            Category.objects.create(name=f'Category {i}')
+
+    def run_view(self, view):
+        request = RequestFactory().get('/')
+        request.resolver_match = type('Match', (), {'view_name': 'test:view'})()
+        return RequestMetricsMiddleware(view)(request)
+
+    def test_counts_queries(self):
+        def view(request):
+            list(Category.objects.all())
+            list(Category.objects.filter(pk__in=[1, 2]))
+            return HttpResponse()
+
+        self.run_view(view)
+        self.assertIn('movies_request_queries_sum{view="test:view"} 2', registry.render())
+
+    def test_flags_repeated_sql_shapes(self):
+        def view(request):
+            for category in Category.objects.all():
+                Category.objects.filter(pk=category.pk).exists()
+            return HttpResponse()
+
+        with self.assertLogs('project.metrics', 'WARNING'):
+            self.run_view(view)
+        self.assertIn('movies_request_nplusone_total{view="test:view"} 1', registry.render())
+
+    def test_queries_outside_requests_are_not_recorded(self):
+        self.run_view(lambda request: HttpResponse())
+        list(Category.objects.all())
+        self.assertIn('movies_request_queries_sum{view="test:view"} 0', registry.render())
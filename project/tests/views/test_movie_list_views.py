@@ -0,0 +1,42 @@
+from django.test import TestCase
+from django.urls import reverse
+from project.models import Category, Movie
+
+
+class MovieListViewTest(TestCase):
+
+    def setUp(self):
+        self.scifi = Category.objects.create(name='Sci-Fi')
+        self.drama = Category.objects.create(name='Drama')
+        Movie.objects.create(title='Star Wars', category=self.scifi, release_year=1977, duration_minutes=121)
+        Movie.objects.create(title='Stardust', category=self.drama, release_year=2007, duration_minutes=127)
+        Movie.objects.create(title='Heat', category=self.drama, release_year=1995, duration_minutes=170)
+        self.url = reverse('website:movie-list-view')
+
+    def test_browse_lists_all_movies(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'movies/lists.html')
+        self.assertEqual(len(response.context['movies']), 3)
+
+    def test_search_filters_by_title(self):
+        response = self.client.get(self.url, {'search': 'sta'})
+        titles = [movie.title for movie in response.context['movies']]
+        self.assertCountEqual(titles, ['Star Wars', 'Stardust'])
+
+    def test_search_with_category(self):
+        response = self.client.get(self.url, {'search': 'sta', 'category': self.drama.pk})
+        titles = [movie.title for movie in response.context['movies']]
+        self.assertEqual(titles, ['Stardust'])
+
+    def test_category_filter_without_search(self):
+        response = self.client.get(self.url, {'category': self.drama.pk})
+        titles = [movie.title for movie in response.context['movies']]
+        self.assertCountEqual(titles, ['Stardust', 'Heat'])
+
+    def test_page_links_keep_the_filters(self):
+        for i in range(12):
+            Movie.objects.create(title=f'Drama {i}', category=self.drama, release_year=2000, duration_minutes=90)
+        response = self.client.get(self.url, {'category': self.drama.pk, 'page': 1})
+        self.assertContains(response, f'href="?category={self.drama.pk}&amp;page=2"')
+        self.assertNotContains(response, 'page=1&amp;page')
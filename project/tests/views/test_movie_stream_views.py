@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from project.models import Movie
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class MovieStreamViewTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewer', password='viewerpass')
+        self.data = bytes(range(256)) * 40  # 10240 bytes
+        self.movie = Movie.objects.create(
+            title='Stream Test',
+            release_year=2024,
+            duration_minutes=90,
+            video_file=SimpleUploadedFile('clip.mp4', self.data, content_type='video/mp4'),
+        )
+        self.url = reverse('website:movie-stream-view', kwargs={'slug': self.movie.slug})
+        self.client.login(username='viewer', password='viewerpass')
+
+    def test_full_file_without_range(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Length'], str(len(self.data)))
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+
+    def test_moov_location_headers(self):
+        self.assertNotIn('X-Moov-Offset', self.client.get(self.url))
+        Movie.objects.filter(pk=self.movie.pk).update(moov_offset=9000, moov_size=1240)
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Moov-Offset'], '9000')
+        self.assertEqual(response['X-Moov-Length'], '1240')
+
+    def test_range_returns_partial_content(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.data)}')
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(b''.join(response.streaming_content), self.data[100:200])
+
+    def test_suffix_and_open_ended_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), self.data[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10000-')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.data[10000:])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=999999-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.data)}')
+
+    def test_invalid_range_is_ignored(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=5-2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+
+    def test_if_range_mismatch_serves_full_file(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], str(len(self.data)))
+
+    def test_movie_without_video_returns_404(self):
+        movie = Movie.objects.create(title='No Video', release_year=2024, duration_minutes=90)
+        response = self.client.get(reverse('website:movie-stream-view', kwargs={'slug': movie.slug}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_anonymous_user_redirected_to_login(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,151 @@
+import io
+import shutil
+import tempfile
+import zlib
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from project.models import ChunkedUpload, Movie
+from project.tests.utils.test_media_probe import mp4
+from project.uploads import UploadError, append_chunk
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ChunkedUploadViewTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='AdminPass123!')
+        self.client.force_login(self.admin)
+        self.movie = Movie.objects.create(title='Upload Test', release_year=2024, duration_minutes=90)
+        self.data = bytes(range(256)) * 100
+        self.chunks = [self.data[i:i + 10000] for i in range(0, len(self.data), 10000)]
+
+    def start(self, filename='clip.mp4'):
+        response = self.client.post(
+            reverse('website:start-upload-view', kwargs={'pk': self.movie.pk}),
+            {'filename': filename, 'total_size': len(self.data)},
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def put(self, upload_id, index, body):
+        return self.client.put(
+            reverse('website:upload-chunk-view', kwargs={'upload_id': upload_id, 'index': index}),
+            body, content_type='application/octet-stream',
+        )
+
+    def complete(self, upload_id, checksum):
+        return self.client.post(
+            reverse('website:complete-upload-view', kwargs={'upload_id': upload_id}),
+            {'checksum': f'{checksum:08x}'},
+        )
+
+    def test_upload_in_chunks_attaches_file(self):
+        upload_id = self.start()
+        for index, chunk in enumerate(self.chunks):
+            self.assertEqual(self.put(upload_id, index, chunk).status_code, 200)
+
+        response = self.complete(upload_id, zlib.crc32(self.data))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['completed'])
+        self.movie.refresh_from_db()
+        self.assertTrue(self.movie.video_file.name.startswith('movies/videos/clip'))
+        with self.movie.video_file.open('rb') as file:
+            self.assertEqual(file.read(), self.data)
+
+    @override_settings(BACKGROUND_TASKS_EAGER=True)
+    def test_completed_upload_is_probed_for_the_duration(self):
+        Movie.objects.filter(pk=self.movie.pk).update(duration_minutes=0)
+        self.data = mp4()
+        upload_id = self.start()
+        self.put(upload_id, 0, self.data)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.complete(upload_id, zlib.crc32(self.data)).status_code, 200)
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.duration_minutes, 90)
+        self.assertIsNotNone(self.movie.moov_offset)
+
+    def test_retried_chunk_is_not_appended_twice(self):
+        upload_id = self.start()
+        self.put(upload_id, 0, self.chunks[0])
+        response = self.put(upload_id, 0, self.chunks[0])
+        self.assertEqual(response.json()['received'], len(self.chunks[0]))
+
+    def test_body_is_read_outside_the_transaction(self):
+        upload_id = self.start()
+        depth = len(connection.atomic_blocks)
+        test = self
+
+        class Body(io.BytesIO):
+            def read(self, size=-1):
+                # Only the test's own atomic block is open.
+                test.assertEqual(len(connection.atomic_blocks), depth)
+                return super().read(size)
+
+        upload = append_chunk(upload_id, 0, Body(self.chunks[0]), len(self.chunks[0]))
+        self.assertEqual(upload.next_chunk, 1)
+
+    def test_chunk_racing_another_append_is_rejected(self):
+        upload_id = self.start()
+        chunk = self.chunks[0]
+
+        class Body(io.BytesIO):
+            def read(self, size=-1):
+                # Another request acknowledges the chunk meanwhile.
+                ChunkedUpload.objects.filter(pk=upload_id).update(next_chunk=1, received=len(chunk))
+                return super().read(size)
+
+        with self.assertRaises(UploadError) as caught:
+            append_chunk(upload_id, 0, Body(chunk), len(chunk))
+        self.assertEqual(caught.exception.status, 409)
+
+    def test_out_of_order_chunk_is_rejected(self):
+        upload_id = self.start()
+        response = self.put(upload_id, 1, self.chunks[1])
+        self.assertEqual(response.status_code, 409)
+
+    def test_status_reports_progress_for_resuming(self):
+        upload_id = self.start()
+        self.put(upload_id, 0, self.chunks[0])
+        response = self.client.get(reverse('website:upload-chunk-view', kwargs={'upload_id': upload_id, 'index': 0}))
+        self.assertEqual(response.json()['next_chunk'], 1)
+
+    def test_checksum_mismatch_discards_upload(self):
+        upload_id = self.start()
+        for index, chunk in enumerate(self.chunks):
+            self.put(upload_id, index, chunk)
+        response = self.complete(upload_id, zlib.crc32(self.data) ^ 1)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ChunkedUpload.objects.filter(pk=upload_id).exists())
+        self.movie.refresh_from_db()
+        self.assertFalse(self.movie.video_file)
+
+    def test_incomplete_upload_cannot_complete(self):
+        upload_id = self.start()
+        self.put(upload_id, 0, self.chunks[0])
+        self.assertEqual(self.complete(upload_id, zlib.crc32(self.chunks[0])).status_code, 409)
+
+    def test_requires_superuser(self):
+        User.objects.create_user(username='viewer', password='ViewerPass123!')
+        self.client.login(username='viewer', password='ViewerPass123!')
+        response = self.client.post(
+            reverse('website:start-upload-view', kwargs={'pk': self.movie.pk}),
+            {'filename': 'clip.mp4', 'total_size': 10},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(ChunkedUpload.objects.exists())
+
+    def test_stale_uploads_are_cleared(self):
+        upload_id = self.start('stale.mp4')
+        call_command('clear_stale_uploads', hours=0, stdout=io.StringIO())
+        self.assertFalse(ChunkedUpload.objects.filter(pk=upload_id).exists())
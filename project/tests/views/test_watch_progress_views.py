@@ -0,0 +1,126 @@
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from project.models import Movie, WatchHistory
+from project.progress import ProgressBuffer, progress_buffer
+
+
+class WatchProgressViewTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        progress_buffer.clear()
+        self.user = User.objects.create_user(username='viewer', password='viewerpass')
+        self.movie = Movie.objects.create(title='Heartbeat', release_year=2024, duration_minutes=120)
+        self.url = reverse('website:watch-progress-view', kwargs={'pk': self.movie.pk})
+        self.client.login(username='viewer', password='viewerpass')
+
+        # Only flush when the tests ask for it
+        patcher = patch.multiple(progress_buffer, flush_interval=3600, flush_size=1000)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_heartbeats_are_buffered_until_flush(self):
+        for minutes in (1, 2, 3):
+            response = self.client.post(self.url, {'watched_minutes': minutes})
+            self.assertEqual(response.status_code, 202)
+
+        self.assertFalse(WatchHistory.objects.exists())
+        self.assertEqual(len(progress_buffer), 1)
+
+        self.assertEqual(progress_buffer.flush(), 1)
+        history = WatchHistory.objects.get(user=self.user, movie=self.movie)
+        self.assertEqual(history.watched_minutes, 3)
+
+    def test_flush_upserts_existing_rows(self):
+        WatchHistory.objects.create(user=self.user, movie=self.movie, watched_minutes=10)
+        self.client.post(self.url, {'watched_minutes': 45})
+        progress_buffer.flush()
+
+        self.assertEqual(WatchHistory.objects.count(), 1)
+        self.assertEqual(WatchHistory.objects.get().watched_minutes, 45)
+
+    def test_size_threshold_triggers_flush(self):
+        progress_buffer.flush_size = 2
+        other = Movie.objects.create(title='Other', release_year=2024, duration_minutes=90)
+
+        self.client.post(self.url, {'watched_minutes': 5})
+        self.assertFalse(WatchHistory.objects.exists())
+        self.client.post(reverse('website:watch-progress-view', kwargs={'pk': other.pk}), {'watched_minutes': 7})
+        self.assertEqual(WatchHistory.objects.count(), 2)
+        self.assertEqual(len(progress_buffer), 0)
+
+    def test_progress_is_clamped(self):
+        self.client.post(self.url, {'watched_minutes': 500})
+        progress_buffer.flush()
+        self.assertEqual(WatchHistory.objects.get().watched_minutes, 120)
+
+    def test_unknown_duration_does_not_clamp_to_zero(self):
+        Movie.objects.filter(pk=self.movie.pk).update(duration_minutes=0)
+        self.client.post(self.url, {'watched_minutes': 25})
+        progress_buffer.flush()
+        self.assertEqual(WatchHistory.objects.get().watched_minutes, 25)
+
+    def test_unknown_movies_are_rejected_at_ingest(self):
+        for pk in (9999, 99999999999999999999999):
+            response = self.client.post(reverse('website:watch-progress-view', kwargs={'pk': pk}), {'watched_minutes': 5})
+            self.assertEqual(response.status_code, 404)
+        self.assertEqual(len(progress_buffer), 0)
+
+    def test_deleted_movies_are_dropped_at_flush(self):
+        self.client.post(self.url, {'watched_minutes': 5})
+        self.movie.delete()
+        self.assertEqual(progress_buffer.flush(), 0)
+        self.assertFalse(WatchHistory.objects.exists())
+
+    def test_failed_flush_does_not_block_later_ones(self):
+        self.client.post(self.url, {'watched_minutes': 5})
+        with patch('project.progress.WatchHistory.objects.bulk_create', side_effect=OverflowError), \
+                self.assertLogs('project.progress', 'ERROR'):
+            self.assertEqual(progress_buffer.flush(), 0)
+        self.assertEqual(len(progress_buffer), 0)
+
+        self.client.post(self.url, {'watched_minutes': 6})
+        self.assertEqual(progress_buffer.flush(), 1)
+        self.assertEqual(WatchHistory.objects.get().watched_minutes, 6)
+
+    def test_late_flush_writes_the_newest_value(self):
+        # Two worker processes sharing the cache.
+        other_worker = ProgressBuffer(flush_interval=3600, flush_size=1000)
+        other_worker.record(self.user.pk, self.movie.pk, 10)
+        self.client.post(self.url, {'watched_minutes': 30})
+        progress_buffer.flush()
+
+        other_worker.flush()
+        self.assertEqual(WatchHistory.objects.get().watched_minutes, 30)
+
+    def test_invalid_progress_is_rejected(self):
+        response = self.client.post(self.url, {'watched_minutes': -1})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('watched_minutes', response.json()['errors'])
+        self.assertEqual(len(progress_buffer), 0)
+
+    def test_get_not_allowed(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
+
+
+class ProgressBufferTimerTest(SimpleTestCase):
+
+    def test_quiet_buffer_is_flushed_by_the_timer(self):
+        buffer = ProgressBuffer(flush_interval=0.05, flush_size=100)
+        written = threading.Event()
+
+        def write(pending):
+            written.set()
+            return len(pending)
+
+        with patch.object(buffer, '_write', side_effect=write), patch('project.progress.connection'):
+            # No further heartbeat arrives after this one.
+            buffer.record(1, 1, 5)
+            self.assertTrue(written.wait(5))
+        self.assertEqual(len(buffer), 0)
@@ -0,0 +1,168 @@
+"""
+Chunked, resumable uploads of movie video files.
+
+The protocol is init -> PUT chunk 0, 1, 2, ... -> complete. Each chunk is
+streamed from the request straight onto the end of the file at its final
+storage path, so memory use is one read block and no temp copy is made.
+A running CRC-32 is stored with the upload and compared with the client's
+checksum on completion; only then is the file attached to the movie.
+
+A chunk that was cut off half way is simply sent again: the file is
+truncated back to the last acknowledged byte before appending. Appending
+needs a storage with local paths (FileSystemStorage). No transaction is
+open while a chunk is read from the network, so long uploads don't hold
+SQLite's lock against every other writer.
+"""
+import os
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows; concurrent retries are then only caught by the conditional UPDATE.
+    fcntl = None
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from project.models import ChunkedUpload, Movie
+
+MAX_CHUNK_SIZE = getattr(settings, 'UPLOAD_MAX_CHUNK_SIZE', 64 * 1024 * 1024)
+MAX_UPLOAD_SIZE = getattr(settings, 'UPLOAD_MAX_SIZE', 20 * 1024 * 1024 * 1024)
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _storage():
+    return Movie._meta.get_field('video_file').storage
+
+
+def start_upload(movie, user, filename, total_size):
+    """
+    Reserve the final storage name with an empty file and record the upload.
+    """
+    field = Movie._meta.get_field('video_file')
+    storage = field.storage
+    name = storage.get_available_name(field.generate_filename(movie, filename))
+    full_path = storage.path(name)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, 'xb'):
+        pass
+    return ChunkedUpload.objects.create(
+        movie=movie, user=user, filename=filename, path=name, total_size=total_size,
+    )
+
+
+def append_chunk(upload_id, index, stream, length):
+    """
+    Append chunk ``index`` of ``length`` bytes, read from ``stream``.
+    Re-sending an acknowledged chunk is a no-op, so retries are safe.
+
+    The body is streamed to disk outside any transaction, so a slow client
+    never holds a database lock; the row is then advanced with one
+    conditional UPDATE.
+    """
+    if length > MAX_CHUNK_SIZE:
+        raise UploadError(f'Chunks may be at most {MAX_CHUNK_SIZE} bytes.', status=413)
+
+    upload = _get(upload_id)
+    with open(_storage().path(upload.path), 'r+b') as file:
+        # Serialises concurrent retries of the same upload.
+        _lock_file(file)
+        # Re-read now that no other request can be writing this file.
+        upload = _get(upload_id)
+        if index < upload.next_chunk:
+            return upload
+        if index > upload.next_chunk:
+            raise UploadError(f'Expected chunk {upload.next_chunk}.', status=409)
+        if upload.received + length > upload.total_size:
+            raise UploadError('Chunk goes past the declared file size.')
+
+        checksum = upload.checksum
+        written = 0
+        # Drop whatever a previous, interrupted attempt left behind.
+        file.seek(upload.received)
+        file.truncate()
+        while written < length:
+            block = stream.read(min(READ_BLOCK_SIZE, length - written))
+            if not block:
+                break
+            file.write(block)
+            checksum = zlib.crc32(block, checksum)
+            written += len(block)
+        if written != length:
+            raise UploadError('Chunk body was shorter than Content-Length.')
+        file.flush()
+
+        updated = ChunkedUpload.objects.filter(
+            pk=upload.pk, next_chunk=index, received=upload.received, completed_at__isnull=True,
+        ).update(received=upload.received + written, next_chunk=index + 1, checksum=checksum)
+    if not updated:
+        raise UploadError('The upload changed while this chunk was written; check its status and retry.', status=409)
+
+    upload.received += written
+    upload.next_chunk = index + 1
+    upload.checksum = checksum
+    return upload
+
+
+def complete_upload(upload_id, checksum):
+    """
+    Check size and CRC-32, then attach the file to the movie. A checksum
+    mismatch discards the upload; the client has to start over.
+    """
+    with transaction.atomic():
+        upload = _locked(upload_id)
+        if upload.received != upload.total_size:
+            raise UploadError(f'Only {upload.received} of {upload.total_size} bytes were received.', status=409)
+        if checksum != upload.checksum:
+            discard_upload(upload)
+            upload = None
+        else:
+            _attach(upload)
+    if upload is None:
+        raise UploadError('Checksum mismatch; the upload was discarded.')
+    return upload
+
+
+def _attach(upload):
+    movie = upload.movie
+    movie.video_file.name = upload.path
+    movie.save(update_fields=['video_file'])
+    upload.completed_at = timezone.now()
+    upload.save(update_fields=['completed_at'])
+
+
+def discard_upload(upload):
+    """
+    Delete an unfinished upload and the partial file it wrote.
+    """
+    _storage().delete(upload.path)
+    upload.delete()
+
+
+def _get(upload_id):
+    try:
+        return ChunkedUpload.objects.get(pk=upload_id, completed_at__isnull=True)
+    except ChunkedUpload.DoesNotExist:
+        raise UploadError('Unknown or finished upload.', status=404)
+
+
+def _lock_file(file):
+    if fcntl is not None:
+        # Released when the file is closed.
+        fcntl.flock(file, fcntl.LOCK_EX)
+
+
+def _locked(upload_id):
+    try:
+        return ChunkedUpload.objects.select_for_update(of=('self',)).select_related('movie').get(
+            pk=upload_id, completed_at__isnull=True,
+        )
+    except ChunkedUpload.DoesNotExist:
+        raise UploadError('Unknown or finished upload.', status=404)
@@ -9,6 +9,23 @@ urlpatterns = [
     path('signup', views.signup_view, name="signup-view"),
     path('categor', views.category_view, name="category-view"),
     path('categor/create', views.create_category_view, name="create-category-view"),
+    path('categor/import', views.catalogue_import_view, {'kind': 'categories'}, name="import-category-view"),
+    path('categor/export', views.catalogue_export_view, {'kind': 'categories'}, name="export-category-view"),
     path('categor/<int:pk>/edit', views.edit_category_view, name="edit-category-view"),
     path('categor/<int:pk>/delete', views.delete_category_view, name="delete-category-view"),
+    path('movies', views.movie_list_view, name="movie-list-view"),
+    path('movies/continue', views.continue_watching_view, name="continue-watching-view"),
+    path('movies/stats', views.viewing_stats_view, name="viewing-stats-view"),
+    path('movies/import', views.catalogue_import_view, {'kind': 'movies'}, name="import-movie-view"),
+    path('movies/export', views.catalogue_export_view, {'kind': 'movies'}, name="export-movie-view"),
+    path('movies/<slug:slug>/stream', views.movie_stream_view, name="movie-stream-view"),
+    path('movies/<int:pk>/progress', views.watch_progress_view, name="watch-progress-view"),
+    path('movies/<int:pk>/uploads', views.start_upload_view, name="start-upload-view"),
+    path('uploads/<uuid:upload_id>/chunks/<int:index>', views.upload_chunk_view, name="upload-chunk-view"),
+    path('uploads/<uuid:upload_id>/complete', views.complete_upload_view, name="complete-upload-view"),
+    path('api/movies', views.api_movie_list_view, name="api-movie-list-view"),
+    path('api/movies/<slug:slug>', views.api_movie_detail_view, name="api-movie-detail-view"),
+    path('api/categories', views.api_category_list_view, name="api-category-list-view"),
+    path('api/movies/<int:pk>/progress', views.api_watch_progress_view, name="api-watch-progress-view"),
+    path('metrics', views.metrics_view, name="metrics-view"),
 ]
\ No newline at end of file
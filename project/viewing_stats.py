@@ -0,0 +1,173 @@
+"""
+Incrementally maintained per-user viewing statistics.
+
+Every WatchHistory write is turned into deltas (minutes watched, titles
+completed) that are added to UserViewingStats and UserCategoryStats with
+F() expressions, so a stats page is a single-row read instead of an
+aggregate over the user's whole history. Single saves and deletes go
+through the receivers below; the progress buffer reports its bulk upserts
+through record_changes().
+
+Edits that bypass both (queryset.update(), a movie changing category or
+duration) let the totals drift; ``manage.py rebuild_viewing_stats``
+recomputes everything from WatchHistory.
+"""
+import operator
+from collections import defaultdict
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from project.models import Movie, UserCategoryStats, UserViewingStats, WatchHistory
+
+# Rows per UPDATE; keeps the OR/CASE lists well inside SQLite's limits.
+UPDATE_CHUNK = 200
+REBUILD_BATCH = 2_000
+
+
+def is_completed(minutes, duration):
+    return duration > 0 and minutes >= duration
+
+
+def collect_deltas(changes):
+    """
+    Fold (user id, category id, duration, old minutes, new minutes) changes
+    into {key: [minutes, completed]} deltas per user and per (user, category).
+    """
+    totals = defaultdict(lambda: [0, 0])
+    by_category = defaultdict(lambda: [0, 0])
+    for user_id, category_id, duration, old, new in changes:
+        minutes = new - old
+        completed = is_completed(new, duration) - is_completed(old, duration)
+        if not minutes and not completed:
+            continue
+        targets = [totals[(user_id,)]]
+        if category_id is not None:
+            targets.append(by_category[(user_id, category_id)])
+        for delta in targets:
+            delta[0] += minutes
+            delta[1] += completed
+    return totals, by_category
+
+
+def _apply(model, key_fields, deltas, create):
+    """
+    Add ``deltas`` to ``model`` rows with one UPDATE per chunk of keys.
+    """
+    deltas = [(key, delta) for key, delta in deltas.items() if any(delta)]
+    if create:
+        model.objects.bulk_create(
+            [model(**dict(zip(key_fields, key))) for key, _ in deltas],
+            ignore_conflicts=True,
+        )
+    for start in range(0, len(deltas), UPDATE_CHUNK):
+        chunk = deltas[start:start + UPDATE_CHUNK]
+        matches = [Q(**dict(zip(key_fields, key))) for key, _ in chunk]
+
+        def increment(field, index):
+            added = Case(
+                *[When(match, then=Value(delta[index])) for match, (_, delta) in zip(matches, chunk)],
+                default=Value(0),
+            )
+            # Never below zero, even if the totals had drifted.
+            return Greatest(F(field) + added, Value(0))
+
+        model.objects.filter(reduce(operator.or_, matches)).update(
+            minutes_watched=increment('minutes_watched', 0),
+            titles_completed=increment('titles_completed', 1),
+        )
+
+
+def record_changes(changes, create=True):
+    """
+    Apply WatchHistory changes to the stats tables. ``create=False`` only
+    updates existing rows, for deletes that may be part of a user's cascade.
+    """
+    totals, by_category = collect_deltas(changes)
+    with transaction.atomic():
+        _apply(UserViewingStats, ('user_id',), totals, create)
+        _apply(UserCategoryStats, ('user_id', 'category_id'), by_category, create)
+
+
+def _movie_details(instance):
+    """
+    (duration, category id) of the history row's movie.
+    """
+    if WatchHistory.movie.is_cached(instance):
+        return instance.movie.duration_minutes, instance.movie.category_id
+    return Movie.objects.filter(pk=instance.movie_id).values_list('duration_minutes', 'category_id').first() or (0, None)
+
+
+@receiver(pre_save, sender=WatchHistory)
+def remember_watched_minutes(sender, instance, raw=False, **kwargs):
+    # Rows that weren't loaded from the database have no snapshot yet.
+    if raw or hasattr(instance, '_loaded_minutes'):
+        return
+    instance._loaded_minutes = (
+        WatchHistory.objects.filter(pk=instance.pk).values_list('watched_minutes', flat=True).first()
+        if instance.pk else None
+    ) or 0
+
+
+@receiver(post_save, sender=WatchHistory)
+def count_saved_watch(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = 0 if created else instance._loaded_minutes
+    if old == instance.watched_minutes:
+        return
+    duration, category_id = _movie_details(instance)
+    record_changes([(instance.user_id, category_id, duration, old, instance.watched_minutes)])
+
+
+@receiver(post_delete, sender=WatchHistory)
+def count_deleted_watch(sender, instance, **kwargs):
+    old = getattr(instance, '_loaded_minutes', instance.watched_minutes)
+    if not old:
+        return
+    duration, category_id = _movie_details(instance)
+    record_changes([(instance.user_id, category_id, duration, old, 0)], create=False)
+
+
+def rebuild_viewing_stats():
+    """
+    Recompute both stats tables from WatchHistory. Returns (users, user-category rows).
+    """
+    completed = Count('pk', filter=Q(movie__duration_minutes__gt=0, watched_minutes__gte=F('movie__duration_minutes')))
+    totals = (
+        WatchHistory.objects.order_by().values('user_id')
+        .annotate(minutes=Sum('watched_minutes'), completed=completed)
+    )
+    by_category = (
+        WatchHistory.objects.order_by().filter(movie__category__isnull=False)
+        .values('user_id', 'movie__category_id')
+        .annotate(minutes=Sum('watched_minutes'), completed=completed)
+    )
+    with transaction.atomic():
+        UserCategoryStats.objects.all().delete()
+        UserViewingStats.objects.all().delete()
+        users = _bulk_insert(UserViewingStats, totals, lambda row: UserViewingStats(
+            user_id=row['user_id'], minutes_watched=row['minutes'], titles_completed=row['completed'],
+        ))
+        categories = _bulk_insert(UserCategoryStats, by_category, lambda row: UserCategoryStats(
+            user_id=row['user_id'], category_id=row['movie__category_id'],
+            minutes_watched=row['minutes'], titles_completed=row['completed'],
+        ))
+    return users, categories
+
+
+def _bulk_insert(model, rows, build):
+    count = 0
+    batch = []
+    for row in rows.iterator(chunk_size=REBUILD_BATCH):
+        batch.append(build(row))
+        if len(batch) >= REBUILD_BATCH:
+            model.objects.bulk_create(batch)
+            count += len(batch)
+            batch = []
+    model.objects.bulk_create(batch)
+    return count + len(batch)
@@ -1,19 +1,49 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth import authenticate, login, logout
-from django.shortcuts import render, redirect
-from django.core.paginator import Paginator
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.shortcuts import render, redirect, get_object_or_404
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib import messages
+from django.views.decorators.http import require_http_methods, require_POST, require_safe
 from project.collectForms.login_form import LoginForm
 from project.collectForms.signup_forms import SignupForm
+from project import catalogue
+from project.bulk import ImportFailed, export_rows, guess_format, import_file
+from project.category_cache import category_cache
+from project.collectForms.bulk_forms import CatalogueImportForm
 from project.collectForms.categories_forms import CategoryForm
-from project.models import Category
+from project.collectForms.movies_forms import ChunkedUploadForm, MovieFilterForm, WatchProgressForm
+from project.metrics import registry
+from project.models import Category, ChunkedUpload, Movie, UserCategoryStats, UserViewingStats, WatchHistory
+from project.pagination import ROW_COUNT_TIMEOUT, CachedCountPaginator, KeysetPaginator, row_count_cache_key
+from project.progress import aaccepts_movie, accepts_movie, progress_buffer
+from project.rails import RAIL_CACHE_TIMEOUT, RAIL_SIZE, build_home_rails
+from project.recommendations import because_you_watched
+from project.search import search_movies
+from project.streaming import ranged_file_response
+from project.throttling import login_attempt_allowed, throttle_counters
+from project.uploads import UploadError, append_chunk, complete_upload, start_upload
 
 def index(request):
     """
     Home page view.
+    Each category rail is a cached fragment; movies are only queried on a miss.
     """
-    return render(request, 'base/body.html')
+    watched, recommended, in_progress = None, [], []
+    if request.user.is_authenticated:
+        watched, recommended = because_you_watched(request.user)
+        in_progress = WatchHistory.objects.continue_watching(request.user)[:RAIL_SIZE]
+    return render(request, 'base/body.html', {
+        'rails': build_home_rails(),
+        'rail_timeout': RAIL_CACHE_TIMEOUT,
+        'watched': watched,
+        'recommended': recommended,
+        'continue_watching': in_progress,
+    })
 
 
 def login_view(request):
@@ -29,6 +59,11 @@ def login_view_post(request):
     if request.method != "POST":
         return redirect('website:login-view-get')
 
+    # Shed brute-force traffic before the form runs any password hashing.
+    if not login_attempt_allowed(request, request.POST.get('username', '')):
+        messages.error(request, 'Too many login attempts. Please try again later.')
+        return redirect('website:login-view-get')
+
     form = LoginForm(request, data=request.POST)
 
     if not form.is_valid():
@@ -73,9 +108,13 @@ def signup_view(request):
 @login_required
 def category_view(request):
     categories= Category.objects.all().order_by('id')
-    paginator = Paginator(categories, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    if 'cursor' in request.GET:
+        # Keyset mode: no COUNT(*) and no OFFSET scan, for very large tables.
+        page_obj = KeysetPaginator(categories, 10).get_page(request.GET.get('cursor'))
+    else:
+        paginator = CachedCountPaginator(categories, 10)
+        page_number = request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
     return render(request, 'dashboard/category/lists.html', {"category_objects": page_obj})
 
 @user_passes_test(lambda user: user.is_superuser)
@@ -132,4 +171,369 @@ def delete_category_view(request, pk):
     except Exception:
         # Any other server errors
         messages.error(request, 'Server error')
-        return redirect('website:category-view')
\ No newline at end of file
+        return redirect('website:category-view')
+
+
+CATALOGUE_LIST_VIEWS = {
+    'categories': 'website:category-view',
+    'movies': 'website:movie-list-view',
+}
+
+
+@user_passes_test(lambda user: user.is_superuser)
+@login_required
+def catalogue_import_view(request, kind):
+    """
+    Import categories or movies from an uploaded CSV/JSON Lines file.
+    Every row is validated first; an invalid file imports nothing.
+    """
+    errors = []
+    if request.method == "POST":
+        form = CatalogueImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            file_format = form.cleaned_data['format'] or guess_format(upload.name)
+            try:
+                created = import_file(kind, upload, file_format)
+            except ImportFailed as failure:
+                errors = failure.errors
+                messages.error(request, 'Nothing was imported. Fix the rows below and try again.')
+            else:
+                messages.success(request, f'Imported {created} {kind}.')
+                return redirect(CATALOGUE_LIST_VIEWS[kind])
+    else:
+        form = CatalogueImportForm()
+
+    return render(request, 'dashboard/catalogue/import.html', {
+        'form': form,
+        'kind': kind,
+        'errors': errors,
+        'back_url': CATALOGUE_LIST_VIEWS[kind],
+    })
+
+
+@require_safe
+@user_passes_test(lambda user: user.is_superuser)
+@login_required
+def catalogue_export_view(request, kind):
+    """
+    Stream every category or movie as CSV (default) or JSON Lines.
+    """
+    file_format = 'jsonl' if request.GET.get('format') == 'jsonl' else 'csv'
+    content_type = 'application/x-ndjson' if file_format == 'jsonl' else 'text/csv'
+    response = StreamingHttpResponse(export_rows(kind, file_format), content_type=f'{content_type}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{kind}.{file_format}"'
+    return response
+
+
+@require_safe
+@login_required
+def movie_stream_view(request, slug):
+    """
+    Stream a movie's video file with HTTP Range support so players can seek.
+    """
+    movie = get_object_or_404(Movie, slug=slug)
+    if not movie.video_file:
+        raise Http404("This movie has no video file.")
+
+    try:
+        path = movie.video_file.path
+    except NotImplementedError:
+        # Remote storages serve ranges themselves.
+        return redirect(movie.video_file.url)
+
+    try:
+        response = ranged_file_response(request, path)
+    except FileNotFoundError:
+        raise Http404("Video file is missing.")
+    if movie.moov_offset is not None:
+        # Lets players fetch the index with one range request before the media.
+        response['X-Moov-Offset'] = str(movie.moov_offset)
+        response['X-Moov-Length'] = str(movie.moov_size)
+    return response
+
+
+CONTINUE_WATCHING_LIMIT = 24
+
+
+@login_required
+def continue_watching_view(request):
+    """
+    Titles the user started but hasn't finished, newest first.
+    """
+    history = WatchHistory.objects.continue_watching(request.user)[:CONTINUE_WATCHING_LIMIT]
+    return render(request, 'movies/continue.html', {'continue_watching': history})
+
+
+@login_required
+def viewing_stats_view(request):
+    """
+    The user's precomputed viewing totals, overall and per category.
+    """
+    stats = UserViewingStats.objects.filter(user=request.user).first() or UserViewingStats(user=request.user)
+    categories = (
+        UserCategoryStats.objects.filter(user=request.user, minutes_watched__gt=0)
+        .select_related('category')
+        .order_by('-minutes_watched')
+    )
+    return render(request, 'movies/stats.html', {'stats': stats, 'category_stats': categories})
+
+
+@require_POST
+@login_required
+def watch_progress_view(request, pk):
+    """
+    Accept a playback progress heartbeat.
+    Heartbeats are buffered and written in bulk, so this only reads the DB
+    to check a movie it hasn't seen lately.
+    """
+    if not accepts_movie(pk):
+        return JsonResponse({'error': 'Unknown movie.'}, status=404)
+    form = WatchProgressForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    progress_buffer.add(request.user.pk, pk, form.cleaned_data['watched_minutes'])
+    return JsonResponse({'status': 'queued'}, status=202)
+
+
+# Native async JSON endpoints: under ASGI these don't tie up a worker thread
+# while the client or the database is slow.
+
+API_PAGE_SIZE = 24
+
+
+def _with_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+@require_safe
+async def api_movie_list_view(request):
+    """
+    A page of movies as JSON, newest first, optionally filtered by ?category=<id or slug>
+    and trimmed to ?fields=. Answers If-None-Match without touching the database.
+    """
+    try:
+        page = max(int(request.GET.get('page') or 1), 1)
+        fields = catalogue.parse_fields(request.GET.get('fields'), catalogue.MOVIE_FIELDS)
+    except catalogue.InvalidFields as error:
+        return JsonResponse({'errors': {'fields': [str(error)]}}, status=400)
+    except ValueError:
+        return JsonResponse({'error': 'page must be an integer.'}, status=400)
+
+    category_id = request.GET.get('category') or None
+    if category_id is not None:
+        # Ids go through the cache as well, so out-of-range ones never reach the database.
+        if category_id.isdecimal():
+            category = await sync_to_async(category_cache.get)(int(category_id))
+        else:
+            category = await sync_to_async(category_cache.get_by_slug)(category_id)
+        if category is None:
+            return JsonResponse({'errors': {'category': ['Unknown category.']}}, status=400)
+        category_id = category.pk
+
+    etag, last_modified = await catalogue.avalidators(request, [Category, Movie])
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return _with_validators(response, etag, last_modified)
+
+    movies = Movie.objects.order_by('-id')
+    if category_id is None:
+        # Same cached total as the HTML list, kept current by the pagination receivers.
+        key = row_count_cache_key(Movie)
+        count = await cache.aget(key)
+        if count is None:
+            count = await movies.acount()
+            await cache.aset(key, count, ROW_COUNT_TIMEOUT)
+    else:
+        movies = movies.filter(category_id=category_id)
+        count = await movies.acount()
+
+    offset = (page - 1) * API_PAGE_SIZE
+    results = []
+    # Pages past the end are empty; huge offsets would also overflow the database's integers.
+    if offset < count:
+        movies = catalogue.restrict(movies, fields, catalogue.MOVIE_FIELDS)[offset:offset + API_PAGE_SIZE]
+        results = [catalogue.serialize(movie, fields, catalogue.MOVIE_FIELDS) async for movie in movies]
+    response = JsonResponse({
+        'count': count,
+        'page': page,
+        'has_next': offset + len(results) < count,
+        'results': results,
+    })
+    return _with_validators(response, etag, last_modified)
+
+
+@require_safe
+async def api_movie_detail_view(request, slug):
+    """
+    One movie as JSON, trimmed to ?fields=, with the signed-in user's progress on it.
+    """
+    try:
+        fields = catalogue.parse_fields(request.GET.get('fields'), catalogue.MOVIE_FIELDS)
+    except catalogue.InvalidFields as error:
+        return JsonResponse({'errors': {'fields': [str(error)]}}, status=400)
+    try:
+        movie = await catalogue.restrict(Movie.objects.all(), fields, catalogue.MOVIE_FIELDS).aget(slug=slug)
+    except Movie.DoesNotExist:
+        return JsonResponse({'error': 'Movie not found.'}, status=404)
+
+    data = catalogue.serialize(movie, fields, catalogue.MOVIE_FIELDS)
+    user = await request.auser()
+    if user.is_authenticated:
+        data['watched_minutes'] = await WatchHistory.objects.filter(user=user, movie=movie).values_list(
+            'watched_minutes', flat=True,
+        ).afirst()
+    return JsonResponse(data)
+
+
+@require_safe
+async def api_category_list_view(request):
+    """
+    Every category as JSON, by name, trimmed to ?fields=.
+    """
+    try:
+        fields = catalogue.parse_fields(request.GET.get('fields'), catalogue.CATEGORY_FIELDS)
+    except catalogue.InvalidFields as error:
+        return JsonResponse({'errors': {'fields': [str(error)]}}, status=400)
+
+    etag, last_modified = await catalogue.avalidators(request, [Category])
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return _with_validators(response, etag, last_modified)
+
+    categories = catalogue.restrict(Category.objects.order_by('name'), fields, catalogue.CATEGORY_FIELDS)
+    results = [catalogue.serialize(category, fields, catalogue.CATEGORY_FIELDS) async for category in categories]
+    return _with_validators(JsonResponse({'results': results}), etag, last_modified)
+
+
+@require_POST
+async def api_watch_progress_view(request, pk):
+    """
+    Async twin of watch_progress_view, answering 401 instead of redirecting to login.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required.'}, status=401)
+    if not await aaccepts_movie(pk):
+        return JsonResponse({'error': 'Unknown movie.'}, status=404)
+    form = WatchProgressForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    # Buffering is in memory; only a due flush needs a thread for the database.
+    if progress_buffer.record(user.pk, pk, form.cleaned_data['watched_minutes']):
+        await sync_to_async(progress_buffer.flush)()
+    return JsonResponse({'status': 'queued'}, status=202)
+
+
+def _upload_status(upload):
+    return {
+        'id': str(upload.id),
+        'filename': upload.filename,
+        'total_size': upload.total_size,
+        'received': upload.received,
+        'next_chunk': upload.next_chunk,
+        'completed': upload.completed_at is not None,
+    }
+
+
+@require_POST
+@user_passes_test(lambda user: user.is_superuser)
+@login_required
+def start_upload_view(request, pk):
+    """
+    Start a chunked upload of a movie's video file.
+    """
+    movie = get_object_or_404(Movie, pk=pk)
+    form = ChunkedUploadForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    upload = start_upload(movie, request.user, form.cleaned_data['filename'], form.cleaned_data['total_size'])
+    return JsonResponse(_upload_status(upload), status=201)
+
+
+@require_http_methods(['GET', 'HEAD', 'PUT'])
+@user_passes_test(lambda user: user.is_superuser)
+@login_required
+def upload_chunk_view(request, upload_id, index):
+    """
+    PUT the raw bytes of chunk ``index``; GET reports how far the upload got.
+    """
+    try:
+        if request.method == 'PUT':
+            length = int(request.headers.get('Content-Length') or 0)
+            # Read the body as a stream; request.body would buffer the chunk.
+            upload = append_chunk(upload_id, index, request, length)
+        else:
+            upload = get_object_or_404(ChunkedUpload, pk=upload_id)
+    except UploadError as error:
+        return JsonResponse({'error': str(error)}, status=error.status)
+    return JsonResponse(_upload_status(upload))
+
+
+@require_POST
+@user_passes_test(lambda user: user.is_superuser)
+@login_required
+def complete_upload_view(request, upload_id):
+    """
+    Verify the CRC-32 (8 hex digits in ``checksum``) and attach the file.
+    """
+    try:
+        checksum = int(request.POST.get('checksum', ''), 16)
+    except ValueError:
+        return JsonResponse({'errors': {'checksum': ['Send the CRC-32 as hex.']}}, status=400)
+    try:
+        upload = complete_upload(upload_id, checksum)
+    except UploadError as error:
+        return JsonResponse({'error': str(error)}, status=error.status)
+    return JsonResponse(_upload_status(upload))
+
+
+def movie_list_view(request):
+    """
+    Browse movies, or search them by title/description when ?search= is given.
+    """
+    form = MovieFilterForm(request.GET or None)
+    category = None
+    search = ''
+    if form.is_bound and form.is_valid():
+        category = form.cleaned_data.get('category')
+        search = form.cleaned_data.get('search', '').strip()
+
+    if search:
+        # Ranked full-text results; the best matches are all anyone reads.
+        return render(request, 'movies/lists.html', {
+            'form': form,
+            'movies': search_movies(search, category=category),
+        })
+
+    movies = Movie.objects.select_related('category').order_by('-id')
+    if category is not None:
+        movies = movies.filter(category=category)
+    paginator = CachedCountPaginator(movies, 12)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    return render(request, 'movies/lists.html', {
+        'form': form,
+        'movies': page_obj,
+        'page_obj': page_obj,
+    })
+
+
+@user_passes_test(lambda user: user.is_superuser)
+@login_required
+def metrics_view(request):
+    """
+    Per-view latency/query histograms in Prometheus text format.
+    """
+    lines = [
+        '# HELP movies_login_throttle_total Login attempts by throttle decision.',
+        '# TYPE movies_login_throttle_total counter',
+    ]
+    for result, value in throttle_counters().items():
+        lines.append(f'movies_login_throttle_total{{result="{result}"}} {value}')
+    body = registry.render() + '\n'.join(lines) + '\n'
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')